@@ -0,0 +1,183 @@
+"""Process every configuration in the log directory across a pool of worker processes.
+
+Each configuration with a full set of trials is parsed, converted to pitch, run through
+forward kinematics, aligned, and summarised in its own worker. The results of each are
+written to config_N.npz with its figure rendered headless in every requested format,
+and one row per configuration is added to summary.csv. Each worker reuses one figure
+per layout for all the configurations it renders.
+
+Usage:
+    python batch_process.py [--logs logs] [--out results] [--experiment hinsdale]
+        [--workers N] [--initial-trim 10] [--formats png svg pdf] [--no-figures]
+"""
+
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from logger import init_logger
+from run_catalog import RunCatalog
+
+NUM_TRIALS = 3
+
+SUMMARY_FIELDS = [
+    "config",
+    "files",
+    "waves",
+    "pred_pitch",
+    "mean_pitch",
+    "std_pitch",
+    "min_pitch",
+    "max_pitch",
+    "ci_low",
+    "ci_high",
+    "n_trials",
+    "n_samples",
+    "seconds",
+]
+
+# Created once per worker, since loading the URDF and predictions is the slow part
+_worker_data = None
+
+# Headless figures of each worker, one per layout (with or without the waves panel)
+_worker_renderers = {}
+
+
+def _init_worker() -> None:
+    global _worker_data
+
+    from process_data import ProcessData
+
+    _worker_data = ProcessData()
+
+
+def _renderer(waves: bool):
+    if waves not in _worker_renderers:
+        from config_figures import ConfigFigureRenderer
+
+        _worker_renderers[waves] = ConfigFigureRenderer(waves)
+    return _worker_renderers[waves]
+
+
+def process_one(
+    config_num: int, file_text_name: str, redos: tuple[bool, ...], out_dir: str, waves: bool, initial_trim: int, formats: list[str]
+) -> dict:
+    """Process a single configuration and write its artifacts.
+
+    Returns:
+        The configuration's summary row.
+    """
+    start = time.perf_counter()
+    results = _worker_data.process_config(config_num, file_text_name, redos, initial_trim=initial_trim, waves=waves)
+
+    stats = results["pitch_stats"]
+    arrays = {
+        "time": results["time"],
+        "joint_positions": results["joint_positions"],
+        "pitch": results["pitch"],
+        "ee_position": results["ee_position"],
+        **{f"pitch_{name}": value for name, value in stats.items() if isinstance(value, np.ndarray)},
+    }
+    if waves:
+        arrays["time_waves"] = results["time_waves"]
+        arrays["pitch_waves"] = results["pitch_waves"]
+    np.savez(os.path.join(out_dir, f"config_{config_num}.npz"), **arrays)
+
+    if formats:
+        renderer = _renderer(waves)
+        renderer.render(results)
+        renderer.save(os.path.join(out_dir, f"config_{config_num}"), formats)
+
+    return {
+        "config": config_num,
+        "files": " ".join(os.path.basename(f) for f in results["files"]),
+        "waves": waves,
+        "pred_pitch": results["pred_pitch"],
+        "mean_pitch": np.nanmean(stats["mean"]),
+        "std_pitch": np.nanmean(stats["std"]),
+        "min_pitch": np.nanmin(stats["min"]),
+        "max_pitch": np.nanmax(stats["max"]),
+        "ci_low": np.nanmean(stats["ci_low"]),
+        "ci_high": np.nanmean(stats["ci_high"]),
+        "n_trials": stats["n_trials"],
+        "n_samples": stats["n_samples"],
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def find_configs(catalog: RunCatalog, experiment: str) -> list[int]:
+    """Get the configurations with a run of every trial."""
+    configs = {run["config"] for run in catalog.query(experiment=experiment)}
+    return sorted(c for c in configs if len(catalog.trials(c, experiment)) >= NUM_TRIALS)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--logs", default="logs", help="the log directory")
+    parser.add_argument("--out", default="results", help="where the results are written")
+    parser.add_argument("--experiment", default="hinsdale", help="the experiment type to process")
+    parser.add_argument("--configs", type=int, nargs="*", help="only process these configurations")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--initial-trim", type=int, default=10, help="samples dropped from the start of each trial")
+    parser.add_argument("--formats", nargs="+", default=["png"], help="figure formats, e.g. png svg pdf")
+    parser.add_argument("--no-figures", action="store_true", help="skip rendering figures")
+    args = parser.parse_args()
+
+    logger = init_logger("batch_process")
+    os.makedirs(args.out, exist_ok=True)
+
+    catalog = RunCatalog(args.logs)
+    catalog.update()
+
+    configs = args.configs or find_configs(catalog, args.experiment)
+    # Each trial is processed from its latest run, i.e. its redo if one was recorded
+    redos = {}
+    for c in configs:
+        latest = {run["trial"]: run["redo"] for run in catalog.trials(c, args.experiment, latest_redo=True)}
+        redos[c] = tuple(latest.get(trial, False) for trial in range(1, NUM_TRIALS + 1))
+    file_text_name = os.path.join(args.logs, f"{args.experiment}_config")
+    # The wave runs are compared against when they were recorded
+    with_waves = {run["config"] for run in catalog.query(experiment="video", trial=1)}
+
+    rows = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+        futures = {
+            pool.submit(
+                process_one,
+                c,
+                file_text_name,
+                redos[c],
+                args.out,
+                c in with_waves,
+                args.initial_trim,
+                [] if args.no_figures else args.formats,
+            ): c
+            for c in configs
+        }
+        for future in as_completed(futures):
+            config_num = futures[future]
+            try:
+                row = future.result()
+            except Exception:
+                logger.exception(f"Configuration {config_num} failed")
+                continue
+
+            rows.append(row)
+            logger.info(f"Configuration {config_num} done in {row['seconds']:.2f} s")
+
+    rows.sort(key=lambda row: row["config"])
+    with open(os.path.join(args.out, "summary.csv"), "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    logger.info(f"Processed {len(rows)}/{len(configs)} configurations in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
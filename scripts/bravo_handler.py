@@ -8,17 +8,46 @@ import time
 
 from pybravo import BravoDriver, DeviceID, Packet, PacketID
 
+from joint_state import DEFAULT_RESPONSE_TIMEOUT, JointSnapshot, JointStateStore
+from rate_scheduler import RateScheduler
+
+# Joint positions are little-endian float32, one per joint
+POSITION_STRUCT = struct.Struct("<f")
+
 
 class BravoHandler:
     """Sends and request position messages from the Bravo."""
 
-    def __init__(self) -> None:
-        """Create a new joint position interface."""
+    def __init__(
+        self,
+        poll_rate: float = 100.0,
+        wait_for_response: bool = False,
+        response_timeout: float = DEFAULT_RESPONSE_TIMEOUT,
+    ) -> None:
+        """Create a new joint position interface.
+
+        Args:
+            poll_rate: The target joint position request rate (Hz).
+            wait_for_response: Hold each request until every joint has answered the
+                previous one, so that the rate backs off instead of flooding the link.
+                The effective rate is then the lower of poll_rate and one over the
+                round-trip time, and a lost response holds polling for up to
+                response_timeout.
+            response_timeout: How long a request may go unanswered before it counts as
+                lost and the next one is sent anyway (s).
+        """
         self._bravo = BravoDriver()
 
         self._running = False
         self.num_joints = 7
-        self.joint_positions = [0.0] * self.num_joints
+        self.response_timeout = response_timeout
+        self._joint_state = JointStateStore(self.num_joints, response_timeout)
+
+        self._scheduler = RateScheduler(poll_rate)
+        self.wait_for_response = wait_for_response
+
+        self._device_ids = [DeviceID(i + 1) for i in range(self.num_joints)]
+        self._all_positions_struct = struct.Struct(f"<{self.num_joints}f")
 
         self._bravo.attach_callback(PacketID.POSITION, self.read_joint_position_cb)
 
@@ -53,14 +82,43 @@ class BravoHandler:
         self.poll_t.join()
         # self.controller_t.join()
 
+    @property
+    def joint_positions(self) -> list[float]:
+        """The joint positions of the latest complete request cycle."""
+        return self._joint_state.snapshot().positions.tolist()
+
+    def joint_snapshot(self) -> JointSnapshot:
+        """Get the latest complete, timestamped joint snapshot without blocking."""
+        return self._joint_state.snapshot()
+
+    def latency_stats(self) -> dict:
+        """Get the request-to-completion latency statistics of the polling cycles."""
+        return self._joint_state.latency_stats()
+
+    def polling_stats(self) -> dict:
+        """Get the achieved polling rate and jitter statistics."""
+        return self._scheduler.stats()
+
     def poll_joint_angles(self) -> None:
-        """Request the current joint positions at a rate of 100 Hz."""
+        """Request the current joint positions at the target polling rate."""
+        request = Packet(
+            DeviceID.ALL_JOINTS, PacketID.REQUEST, bytes([PacketID.POSITION.value])
+        )
+
+        self._scheduler.reset()
         while self._running:
-            request = Packet(
-                DeviceID.ALL_JOINTS, PacketID.REQUEST, bytes([PacketID.POSITION.value])
-            )
+            if self.wait_for_response:
+                self._wait_for_cycle()
+
+            self._joint_state.begin_cycle()
             self._bravo.send(request)
-            time.sleep(0.01)
+            self._scheduler.wait()
+
+    def _wait_for_cycle(self) -> None:
+        """Wait for the previous request to be answered, up to the response timeout."""
+        give_up = time.monotonic() + self.response_timeout
+        while self._joint_state.cycle_pending() and time.monotonic() < give_up:
+            time.sleep(0.0002)
 
     def read_joint_position_cb(self, packet: Packet) -> None:
         """Handle the joint position reading.
@@ -70,28 +128,41 @@ class BravoHandler:
         """
         # The unpacking order will need to change according to the system on which the
         # data is received (i.e., Windows vs Linux)
-        position: float = struct.unpack("<f", packet.data)[0]
+        position: float = POSITION_STRUCT.unpack(packet.data)[0]
 
         # The jaws are a linear joint; convert from mm to m
         if packet.device_id == DeviceID.LINEAR_JAWS:
             position *= 0.001
 
-        # Save the joint positions at the same index as their ID
-        self.joint_positions[packet.device_id.value - 1] = position
+        # Stage the joint position at the same index as its ID
+        self._joint_state.update(packet.device_id.value - 1, position)
 
-    def _run_controller(self, desired_config):
-        # Create the packets and send them to the Bravo   
-        # TODO: Try and see if you can send the Packet to ALL_JOINTS instead of individually 
-        for i, position in enumerate(desired_config):
-            packet = Packet(DeviceID(i+1), PacketID.POSITION, struct.pack("<f", position))
+    def send_joint_positions(self, desired_config, all_joints: bool = False) -> None:
+        """Command every joint position without blocking.
+
+        Args:
+            desired_config: The joint setpoints, ordered by device ID starting at 1.
+            all_joints: Send all setpoints in a single ALL_JOINTS packet instead of a
+                back-to-back burst of per-joint packets. Only use this with firmware that
+                accepts multi-joint position packets.
+        """
+        if all_joints:
+            data = self._all_positions_struct.pack(*desired_config)
+            self._bravo.send(Packet(DeviceID.ALL_JOINTS, PacketID.POSITION, data))
+            return
+
+        # Encode everything up front so that the sends go out with minimal skew
+        packets = [
+            Packet(device_id, PacketID.POSITION, POSITION_STRUCT.pack(position))
+            for device_id, position in zip(self._device_ids, desired_config)
+        ]
+        for packet in packets:
             self._bravo.send(packet)
-        time.sleep(0.1)
 
-        # Could maybe try replacing "DeviceID.ALL_JOINTS" with "8"
-        # one, two, three, four, five, six, seven = self.desired_config
-        # packet = Packet(DeviceID.ALL_JOINTS, PacketID.POSITION, struct.pack("<fffffff", one, two, three, four, five, six, seven))
-        # print(packet)
-        # self._bravo.send(packet)
+    def _run_controller(self, desired_config, all_joints: bool = False):
+        """Command every joint position and give the arm time to receive them."""
+        self.send_joint_positions(desired_config, all_joints)
+        time.sleep(0.1)
 
 
 if __name__ == "__main__":
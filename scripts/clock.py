@@ -0,0 +1,76 @@
+"""Common timebase for the Bravo and DAQ streams.
+
+Every source stamps its samples with now(), which is derived from time.monotonic_ns()
+and so never jumps with NTP or daylight-saving changes. to_wall_time() converts a stamp
+to Unix time for logs, using an offset that is fixed when this module is imported.
+"""
+
+import time
+
+import numpy as np
+
+_WALL_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+
+
+def now_ns() -> int:
+    """Get the current time on the common clock (ns)."""
+    return time.monotonic_ns()
+
+
+def now() -> float:
+    """Get the current time on the common clock (s)."""
+    return time.monotonic_ns() * 1e-9
+
+
+def to_wall_time(t: float) -> float:
+    """Convert a time on the common clock (s) to Unix time (s)."""
+    return t + _WALL_OFFSET_NS * 1e-9
+
+
+def interpolate_at(t_query, times, values, max_gap: float | None = None) -> np.ndarray:
+    """Linearly interpolate timestamped samples at the query times.
+
+    Args:
+        t_query: The times to evaluate at, shape (M,).
+        times: The increasing sample times, shape (N,).
+        values: The samples, shape (N,) or (N, ...) with one row per sample.
+        max_gap: If set, queries whose nearest sample is further away than this (s) are
+            NaN instead of being interpolated across the gap or extrapolated.
+
+    Returns:
+        The interpolated values, shape (M,) or (M, ...).
+    """
+    t_query = np.asarray(t_query, dtype=float)
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float)
+
+    # One searchsorted serves every column
+    idx = np.clip(np.searchsorted(times, t_query, side="right") - 1, 0, max(len(times) - 2, 0))
+    nxt = np.minimum(idx + 1, len(times) - 1)
+    span = times[nxt] - times[idx]
+    weight = np.clip((t_query - times[idx]) / np.where(span > 0, span, 1.0), 0.0, 1.0)
+
+    if values.ndim > 1:
+        weight = weight.reshape(-1, *([1] * (values.ndim - 1)))
+    result = values[idx] * (1.0 - weight) + values[nxt] * weight
+
+    if max_gap is not None:
+        nearest = np.minimum(np.abs(t_query - times[idx]), np.abs(times[nxt] - t_query))
+        result[nearest > max_gap] = np.nan
+
+    return result
+
+
+def merge_streams(reference_times, *streams, max_gap: float | None = 0.01) -> list[np.ndarray]:
+    """Resample independently stamped streams onto one set of reference times.
+
+    Args:
+        reference_times: The times every stream is evaluated at, e.g. the arrival times
+            of the joint snapshots.
+        streams: (times, values) pairs, one per stream.
+        max_gap: The largest distance (s) to a real sample before a value becomes NaN.
+
+    Returns:
+        The values of each stream at the reference times.
+    """
+    return [interpolate_at(reference_times, times, values, max_gap) for times, values in streams]
@@ -0,0 +1,144 @@
+"""Reusable figure of a processed configuration.
+
+The figure, its axes, and every artist are created once, and drawing another configuration
+only swaps the data, so a worker can render a whole set of configurations without
+rebuilding anything. Without a figure to draw into, the renderer uses Agg directly and
+never touches pyplot or a GUI.
+"""
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+
+# Joint columns shown in the trajectory panel, with their colours
+TRAJECTORY_JOINTS = ((2, 'purple'), (4, 'red'), (5, 'black'))
+
+
+class ConfigFigureRenderer:
+    """Draws the trajectory, end-effector path, and pitch panels of a configuration."""
+
+    def __init__(self, waves: bool = False, fig: Figure | None = None, dpi: float = 100) -> None:
+        """Create the figure and its artists.
+
+        Args:
+            waves: Add the panel comparing the pitch with the wave run.
+            fig: A figure to draw into, e.g. a pyplot one to show; by default a headless
+                Agg figure is made.
+            dpi: The resolution of the headless figure.
+        """
+        if fig is None:
+            fig = Figure(figsize=(16 if waves else 12, 4.5), dpi=dpi, layout='constrained')
+            FigureCanvasAgg(fig)
+
+        self.fig = fig
+        self.waves = waves
+        self.title = fig.suptitle('', fontsize=14)
+
+        axes = fig.subplots(1, 4 if waves else 3)
+
+        # First subplot
+        ax = axes[0]
+        self.joint_lines = [ax.plot([], [], color=color)[0] for _, color in TRAJECTORY_JOINTS]
+        ax.set_xlabel('Time (s)')
+        ax.set_ylabel('Position (rad)')
+        ax.set_title('Bravo Trajectory')
+        ax.legend(['joint 1', 'joint 2', 'joint 3'])
+
+        # Second subplot
+        ax = axes[1]
+        (self.ee_line,) = ax.plot([], [])
+        ax.set_xlabel('x (m)')
+        ax.set_ylabel('y (m)')
+        ax.set_title('End-Effector Position')
+        ax.legend(['bravo traj'])
+
+        # Third subplot, and the waves comparison that repeats it
+        self.pitch_panels = [self._pitch_panel(axes[2], 'Average Frame Pitch')]
+        if waves:
+            self.pitch_panels.append(self._pitch_panel(axes[3], 'Pitch Comparision - Waves'))
+            (self.waves_line,) = axes[3].plot([], [], color='C1')
+            self._add_legend(axes[3], self.pitch_panels[1], self.waves_line)
+        self._add_legend(axes[2], self.pitch_panels[0])
+
+        for ax in axes:
+            ax.grid(color='black', linestyle='-', linewidth=0.1)
+        self.axes = axes
+
+    def _pitch_panel(self, ax, title: str) -> dict:
+        panel = {
+            'ax': ax,
+            'avg': ax.plot([], [], color='black')[0],
+            'band': ax.add_collection(PolyCollection([], color='black', alpha=0.4)),
+            'pred': ax.plot([], [], '--', color='C0')[0],
+        }
+        ax.set_xlabel('Time (s)')
+        ax.set_ylabel('Pitch (deg)')
+        ax.set_title(title)
+        return panel
+
+    def _add_legend(self, ax, panel: dict, *extra) -> None:
+        handles = [panel['avg'], panel['band'], panel['pred'], *extra]
+        labels = ['Avg', 'Std', 'Pred', *(['Waves'] if extra else [])]
+        panel['legend'] = ax.legend(handles, labels)
+
+    def render(self, results: dict) -> Figure:
+        """Draw a processed configuration, replacing the previous one.
+
+        Args:
+            results: The output of ProcessData.process_config.
+
+        Returns:
+            The figure.
+        """
+        if self.waves != ('pitch_waves' in results):
+            raise ValueError('The results and the figure layout disagree on the waves panel')
+
+        time = np.asarray(results['time'])
+        joint_positions = np.asarray(results['joint_positions'][0])
+        ee_position = np.asarray(results['ee_position'])
+        pitch_avg = np.asarray(results['pitch_stats']['mean'])
+        pitch_std = np.asarray(results['pitch_stats']['std'])
+        pred_pitch = results['pred_pitch']
+
+        self.title.set_text(f"Configuration #{results['config_num']}")
+
+        for line, (column, _) in zip(self.joint_lines, TRAJECTORY_JOINTS):
+            line.set_data(time, joint_positions[:, column])
+        self.ee_line.set_data(ee_position[:, 0], ee_position[:, 2])
+
+        band = np.concatenate((np.column_stack((time, pitch_avg - pitch_std)), np.column_stack((time[::-1], (pitch_avg + pitch_std)[::-1]))))
+        pred_x = [time[0], time[-1]] if len(time) else []
+        for panel in self.pitch_panels:
+            panel['avg'].set_data(time, pitch_avg)
+            panel['band'].set_verts([band])
+            panel['pred'].set_data(pred_x, [pred_pitch] * len(pred_x))
+            panel['legend'].get_texts()[2].set_text(f'Pred: {round(pred_pitch, 1)}')
+
+        if self.waves:
+            self.waves_line.set_data(results['time_waves'], results['pitch_waves'])
+
+        for ax in self.axes:
+            ax.relim()
+            ax.autoscale_view()
+        for panel in self.pitch_panels:
+            # Collections are not part of relim
+            panel['ax'].update_datalim(band)
+            panel['ax'].autoscale_view()
+
+        return self.fig
+
+    def save(self, path: str, formats=('png',)) -> list[str]:
+        """Write the figure in each format, e.g. png, svg, or pdf.
+
+        Args:
+            path: The output path without an extension.
+            formats: The file formats to write.
+
+        Returns:
+            The written files.
+        """
+        files = [f'{path}.{fmt}' for fmt in formats]
+        for filename in files:
+            self.fig.savefig(filename)
+        return files
@@ -1,24 +1,55 @@
-import mat73
+import os
 import numpy as np
 import sys
 
 sys.path.append("..")
 
+# Loaded configuration arrays, keyed by file, load options, and file modification time
+_config_cache = {}
+
+
+def _read_configs(data_file):
+    """Read the raw configs from a .mat file, going through a .npy sidecar when it is fresh"""
+    sidecar = f"{data_file}.configs.npy"
+    if os.path.isfile(sidecar) and os.path.getmtime(sidecar) >= os.path.getmtime(data_file):
+        return np.load(sidecar)
+
+    # mat73 parses the whole HDF5 file, so only pay for the import on a cache miss
+    import mat73
+    configs = np.asarray(mat73.loadmat(data_file)['configs'])
+
+    # Write to a temporary file first so that a concurrent reader never sees half a sidecar
+    try:
+        tmp_file = f"{sidecar}.{os.getpid()}.tmp.npy"
+        np.save(tmp_file, configs)
+        os.replace(tmp_file, sidecar)
+    except OSError:
+        pass
+
+    return configs
+
 
 class ArmConfig:
-    def __init__(self):
+    def __init__(self, data_file="data/out_of_plane_config.mat"):
         # Predetermined home position
         self.initial_config = np.array([0, 1.57, 2.64, 0, 0.6, 3.04, 3.14])
         self.desired_config = self.initial_config
-        
-        self.load_matfile_data()
+        self.data_file = data_file
+
+        self.configs = self.load_matfile_data(data_file)
 
-    def load_matfile_data(self, data_file="data/out_of_plane_config.mat", flip_joint_order=True, add_home=True):
-        # Load file from file path
-        file = mat73.loadmat(data_file)
+    def load_matfile_data(self, data_file=None, flip_joint_order=True, add_home=True):
+        if data_file is None:
+            data_file = self.data_file
+
+        # Reuse an earlier load unless the file has changed since
+        data_file = os.path.abspath(data_file)
+        key = (data_file, flip_joint_order, add_home, tuple(self.initial_config), os.stat(data_file).st_mtime_ns)
+        if key in _config_cache:
+            return _config_cache[key].copy()
 
         # Extract the configuration data
-        configs = file['configs']
+        configs = _read_configs(data_file)
 
         # Flip order of joint angles?
         if flip_joint_order:
@@ -27,16 +58,16 @@ class ArmConfig:
         # Add home arm configuration
         if add_home:
             configs = np.insert(configs, 0, self.initial_config, 0)
-        
-        return configs
+
+        _config_cache[key] = configs
+        return configs.copy()
     
     def _get_config(self, desired_config_num):
         """Load predetermined configurations of the arm"""
-        all_configs = self.load_matfile_data()
-        self.desired_config = all_configs[desired_config_num]
+        self.desired_config = self.configs[desired_config_num]
     
 
 if __name__ == '__main__':
     arm_configs = ArmConfig()
     config_data = arm_configs.load_matfile_data()
-    print(config_data)
\ No newline at end of file
+    print(config_data)
@@ -1,13 +1,13 @@
 import struct
 import sys
 import time
-import mat73
-import numpy as np
 
 sys.path.append("..")
 
 from pybravo import BravoDriver, DeviceID, Packet, PacketID
 
+from config_loader import ArmConfig
+
 
 if __name__ == "__main__":
     bravo = BravoDriver()
@@ -17,11 +17,7 @@ if __name__ == "__main__":
     time.sleep(0.05)
 
     # Specify the desird positions
-    initial_config = [0, 1.57, 2.64, 0, 0.6, 3.04, 3.14]
-    configs_file = mat73.loadmat('data/out_of_plane_config.mat')
-    configs = configs_file['configs']
-    configs_fl = np.fliplr(configs)
-    final_configs_fl = np.insert(configs_fl, 0, initial_config, 0)
+    final_configs_fl = ArmConfig().configs
 
     print("\nWARNING: Joint 1 (gripper - prismatic joint) operates in a range from 0.0-10.0mm\nThe jaw opening is max at ~100mm\n")
 
@@ -1,13 +1,41 @@
-import nidaqmx
-from nidaqmx.constants import TerminalConfiguration
 import atexit
 import sys
 import threading
 import time
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
 import numpy as np
 
+import clock
+from ring_buffer import RingBuffer
+
+
+def _load_nidaqmx():
+    """Import the NI driver bindings, or return None on machines without them"""
+    try:
+        import nidaqmx
+        import nidaqmx.stream_readers
+    except ImportError:
+        return None
+    return nidaqmx
+
+
+def expand_channels(physical_chan):
+    """Expand a channel string like "Dev1/ai1:2, Dev1/ai4" into its individual channels"""
+    if not isinstance(physical_chan, str):
+        physical_chan = ",".join(physical_chan)
+
+    channels = []
+    for chan in physical_chan.split(","):
+        chan = chan.strip()
+        device, _, name = chan.rpartition("/")
+        prefix = name.rstrip("0123456789:")
+        if ":" in name:
+            first, last = name[len(prefix):].split(":")
+            for i in range(int(first), int(last) + 1):
+                channels.append(f"{device}/{prefix}{i}")
+        else:
+            channels.append(chan)
+    return channels
+
 # import dash
 # from dash.dependencies import Output, Input
 # import dash_core_components as dcc
@@ -18,14 +46,58 @@ import numpy as np
 # from collections import deque
 
 class NI_Device:
-    def __init__(self):
-        ''' Create a new NI device interface'''
-        self.RSE = TerminalConfiguration.RSE
+    def __init__(
+        self,
+        streaming=False,
+        physical_chan="Dev1/ai1",
+        sample_rate=1000.0,
+        chunk_size=50,
+        buffer_seconds=60.0,
+        calibration=None,
+        backend=None,
+    ):
+        ''' Create a new NI device interface
+
+        Args:
+            streaming: Acquire continuously on the DAQ sample clock instead of creating
+                a new task for every on-demand read.
+            physical_chan: The analog input channel(s) to read, e.g. "Dev1/ai1:2" or a
+                list of channel names. All channels share one task and sample clock.
+            sample_rate: The hardware sample clock rate (Hz) used when streaming.
+            chunk_size: The number of samples read per call when streaming.
+            buffer_seconds: How much streamed history the ring buffer holds.
+            calibration: Optional (gain, offset) pair per channel, applied to the raw
+                voltages as gain * volts + offset.
+            backend: The nidaqmx module, or a fake_nidaqmx.FakeNIDAQmx to run without
+                hardware.
+        '''
+        self._backend = backend if backend is not None else _load_nidaqmx()
+        if self._backend is None:
+            raise RuntimeError("nidaqmx is not installed; pass a fake backend to run without a DAQ")
+
+        self.RSE = self._backend.constants.TerminalConfiguration.RSE
         self._running = False
         self.voltage_reading = [0]
+        self.voltage_timestamp = float("nan")
+
+        self.streaming = streaming
+        self.channels = expand_channels(physical_chan)
+        self.num_channels = len(self.channels)
+        self.physical_chan = ",".join(self.channels)
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.buffer = RingBuffer(int(sample_rate * buffer_seconds), self.num_channels)
+
+        # Per-channel calibration, shaped to broadcast over a (channels, samples) chunk
+        if calibration is None:
+            calibration = [(1.0, 0.0)] * self.num_channels
+        if len(calibration) != self.num_channels:
+            raise ValueError(f"Expected {self.num_channels} calibrations, got {len(calibration)}")
+        self._gain = np.array([[gain] for gain, _ in calibration], dtype=float)
+        self._offset = np.array([[offset] for _, offset in calibration], dtype=float)
 
         # Create a new thread to poll the DAQ readings
-        self.poll_t = threading.Thread(target=self.read_daq)
+        self.poll_t = threading.Thread(target=self.stream_daq if streaming else self.read_daq)
         self.poll_t.daemon = True
         
         # Make sure that we shutdown the interface when we exit
@@ -43,26 +115,131 @@ class NI_Device:
         self._running = False
         self.poll_t.join()
 
-    def read_daq(self, physical_chan="Dev1/ai1", num_samples=1):
-        """Sample the DAQ at a rate of 100Hz"""
+    def read_daq(self, physical_chan=None, num_samples=1):
+        """Sample the DAQ on demand, creating a new task for every read"""
+        if physical_chan is None:
+            physical_chan = self.physical_chan
+
         while self._running:
-            with nidaqmx.Task() as task:
+            with self._backend.Task() as task:
                 # task.channel_
                 # Add channel from daq and set the configuration reader
                 task.ai_channels.add_ai_voltage_chan(physical_chan, terminal_config=self.RSE)
                 
-                # Read the voltage
-                self.voltage_reading = task.read(number_of_samples_per_channel=num_samples)
+                # Read the voltage and keep the latest calibrated value of each channel
+                raw = np.asarray(task.read(number_of_samples_per_channel=num_samples), dtype=float)
+                latest = raw.reshape(self.num_channels, -1)[:, -1:]
+                self.voltage_reading = (latest * self._gain + self._offset)[:, 0].tolist()
+                self.voltage_timestamp = clock.now()
+
+    def stream_daq(self):
+        """Continuously sample the DAQ on its hardware clock into the ring buffer"""
+        chunk = np.zeros((self.num_channels, self.chunk_size))
+        offsets = np.arange(self.chunk_size) / self.sample_rate
+        timestamps = np.zeros(self.chunk_size)
+
+        with self._backend.Task() as task:
+            task.ai_channels.add_ai_voltage_chan(self.physical_chan, terminal_config=self.RSE)
+
+            # Let the driver buffer a second of samples in case a read is late
+            task.timing.cfg_samp_clk_timing(
+                self.sample_rate,
+                sample_mode=self._backend.constants.AcquisitionType.CONTINUOUS,
+                samps_per_chan=max(int(self.sample_rate), self.chunk_size),
+            )
+            reader = self._backend.stream_readers.AnalogMultiChannelReader(task.in_stream)
+
+            task.start()
+            start_time = float("inf")
+            num_read = 0
+            next_time = float("-inf")
+
+            while self._running:
+                reader.read_many_sample(chunk, number_of_samples_per_channel=self.chunk_size)
+                read_time = clock.now()
+                np.multiply(chunk, self._gain, out=chunk)
+                np.add(chunk, self._offset, out=chunk)
+
+                # Sample times follow from the sample clock. Each read returns no earlier
+                # than its last sample, so the earliest start time implied by any read is
+                # the tightest bound on when the clock actually started
+                num_read += self.chunk_size
+                start_time = min(start_time, read_time - (num_read - 1) / self.sample_rate)
+
+                chunk_start = start_time + (num_read - self.chunk_size) / self.sample_rate
+                chunk_end = chunk_start + offsets[-1]
+
+                # Buffered chunks keep their stamps when the bound tightens, so a chunk never
+                # starts before the sample after the previous one. It is squeezed to end on
+                # the new bound instead, which keeps the times increasing while they converge
+                if chunk_start >= next_time:
+                    np.add(offsets, chunk_start, out=timestamps)
+                elif chunk_end > next_time:
+                    timestamps[:] = np.linspace(next_time, chunk_end, self.chunk_size)
+                else:
+                    np.add(offsets, next_time, out=timestamps)
+                next_time = timestamps[-1] + 1 / self.sample_rate
+
+                self.buffer.extend(timestamps, chunk)
+                self.voltage_reading = chunk[:, -1].tolist()
+
+    def latest(self):
+        """Get the most recent streamed timestamp and per-channel values, or None"""
+        return self.buffer.latest()
+
+    def samples_since(self, t):
+        """Get the streamed timestamps and (channels, samples) values acquired after time t"""
+        return self.buffer.since(t)
+
+    def acquired_until(self):
+        """Get the time up to which streamed samples have arrived, or -inf before the first chunk
+
+        A time at or before this is bracketed by real samples. On-demand mode never has
+        anything better than its latest read, so every time counts as acquired.
+        """
+        if not self.streaming:
+            return float("inf")
+
+        latest = self.buffer.latest()
+        return float("-inf") if latest is None else latest[0]
+
+    def value_at(self, t, max_gap=None):
+        """Get the per-channel values at time t on the common clock
+
+        Streamed samples are interpolated at t; on-demand mode can only offer the latest read.
+        Wait until acquired_until() has passed t to get a value between two real samples,
+        and pass a max_gap to get NaN rather than a held value when there are none near t.
+        """
+        if not self.streaming:
+            return np.array(self.voltage_reading, dtype=float)
+
+        # Interpolating needs the samples on both sides of t. Samples arrive a chunk at a
+        # time, so the newest one can be up to a chunk older than t; look back past that
+        lookback = (self.chunk_size + 2) / self.sample_rate
+        timestamps, values = self.buffer.since(t - lookback)
+        if len(timestamps) == 0:
+            return np.full(self.num_channels, np.nan)
+        return clock.interpolate_at([t], timestamps, values.T, max_gap)[0]
+
+    def read(self, num_samples):
+        """Get the newest streamed timestamps and (channels, samples) values"""
+        return self.buffer.last(num_samples)
 
     def plot_data(self, data):
         """Plot the DAQ output voltage"""
+        import matplotlib.pyplot as plt
+
         plt.plot(data, '.')
         plt.ylabel('Output voltage (V)')
         plt.show()
 
 
 if __name__ == '__main__':
-    ni_device = NI_Device()
+    if "--fake" in sys.argv:
+        from fake_nidaqmx import FakeNIDAQmx
+        ni_device = NI_Device(streaming=True, backend=FakeNIDAQmx())
+    else:
+        ni_device = NI_Device()
     
     ni_device.start()
 
@@ -1,128 +1,183 @@
-import matplotlib.pyplot as plt
+"""Live viewer of the pitch telemetry published by pitch_compliance or data_writer.
+
+Scroll to zoom the time window in and out, use the left and right arrow keys to scrub
+back through the session, and press End to return to the live edge.
+
+Usage:
+    python data_plotter.py [--host HOST] [--port 6969] [--window 10] [--fps 30]
+"""
+
+import argparse
 import socket
-import struct
-import sys
+import threading
 import time
+
+import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.animation import FuncAnimation
+
+from history import MultiResolutionHistory
+from logger import init_logger
+from sensor_model import PitchSensorModel
+from telemetry import TELEMETRY_PORT, TelemetryReader
 
 
 class LivePlot:
-    def __init__(self, queue_len=1) -> None:
-        self.xs = []
-        self.ys = []
-        self.queue_len = queue_len
-        self.init_time = time.time()
+    """Live pitch plot that redraws at a fixed frame rate, independent of the data rate.
+
+    Samples go into a bounded multi-resolution history, from any thread, and every frame
+    only updates the data of the existing artists, which are blitted over a cached
+    background. Time is drawn relative to the newest sample, so the axes only change, and
+    need a full redraw, when the view is zoomed or scrubbed.
+    """
+
+    ZOOM_STEP = 1.5
+
+    def __init__(self, window: float = 10.0, capacity: int = 4096, fps: float = 30.0, pitch_range=(0.0, 25.0)) -> None:
+        """Create a new live plot.
+
+        Args:
+            window: The span of the pitch history that is shown (s).
+            capacity: The number of samples or buckets kept per history level.
+            fps: The redraw rate (Hz).
+            pitch_range: The limits of the pitch axis (deg).
+        """
+        self.window = window
+        self.offset = 0.0  # How far the view ends before the newest sample (s)
+        self.fps = fps
+        self.history = MultiResolutionHistory(capacity)
+        self.frames_drawn = 0
+
         self.f, (self.ax1, self.ax2) = plt.subplots(1, 2)
 
         self.ax1.set_title('Measured Pitch')
         self.ax1.set_ylabel('Pitch (deg)')
         self.ax1.set_xlabel('Time (s)')
+        self.ax1.set(xlim=(-window, 0), ylim=pitch_range)
+        self.ax1.grid(color='black', linestyle='-', linewidth=0.1)
 
         self.ax2.set_title('Pitching Frame')
         self.ax2.set_ylabel('z')
         self.ax2.set_xlabel('x')
-
-        # plt.show()
-
-    def plotter(self, data):
-        self.xs.append(time.time() - self.init_time)
-        self.ys.append(data)
-
-        self.xs = self.xs[-self.queue_len:]
-        self.ys = self.ys[-self.queue_len:]
-
-        # Animating pitch over time
-        # self.ax1.cla()
-        self.ax1.plot(self.xs, self.ys, color='green')
-        # self.ax1.draw()
-        # self.ax1.tight_layout()
-
-        # Animating pitch model
-        theta = np.radians(90 - data)
-        c, s = np.cos(theta), np.sin(theta)
-        R = np.array(((c, -s), (s, c)))
-        x = [0]
-        y = [0]
-        point = np.array([1, 0])
-        point_rot = R * point
-        
-        x.append(point_rot[0][0])
-        y.append(point_rot[1][0])
-        
-        # self.ax2.cla()
         self.ax2.set(xlim=(0, 1), ylim=(0, 1))
-        self.ax2.plot(x, y, color='blue')
-        self.ax2.legend([f"Pitch (deg): {round(data, 3)}"])
-        # plt.show()
+
+        # The only artists that change; they are drawn by the blitting animation. Zoomed
+        # out, the line is the mean of each bucket and the envelope spans its min and max
+        (self.envelope_line,) = self.ax1.plot([], [], color='green', alpha=0.3, linewidth=0.8, animated=True)
+        (self.pitch_line,) = self.ax1.plot([], [], color='green', animated=True)
+        self.view_text = self.ax1.text(0.02, 0.97, '', transform=self.ax1.transAxes, va='top', animated=True)
+        (self.frame_line,) = self.ax2.plot([0, 1], [0, 0], color='blue', animated=True)
+        self.pitch_text = self.ax2.text(0.05, 0.95, '', transform=self.ax2.transAxes, va='top', animated=True)
+
+    @property
+    def artists(self):
+        return self.envelope_line, self.pitch_line, self.view_text, self.frame_line, self.pitch_text
+
+    def add(self, timestamps, pitches) -> None:
+        """Buffer pitch samples (deg) with their timestamps (s); safe from any thread."""
+        self.history.extend(timestamps, pitches)
+
+    def plotter(self, data: float) -> None:
+        """Buffer a single pitch sample (deg), stamped now."""
+        self.add([time.time()], [data])
+
+    def update(self, _frame=None):
+        """Point the artists at the newest samples.
+
+        Returns:
+            The artists to redraw.
+        """
+        latest = self.history.latest()
+        if latest is not None:
+            newest_time, pitch = latest
+            view_end = newest_time - self.offset
+
+            # A min and a max per pixel column is all that can be seen
+            level, t, mins, maxs, means = self.history.view(
+                view_end - self.window, view_end if self.offset else None, max_points=2 * int(self.ax1.bbox.width)
+            )
+            t = t - newest_time
+            self.pitch_line.set_data(t, means)
+            self.envelope_line.set_data(np.repeat(t, 2), np.column_stack((mins, maxs)).ravel())
+            self.view_text.set_text(f"{self.window:.4g} s, 1:{self.history.factor ** level}")
+
+            theta = np.radians(pitch)
+            self.frame_line.set_data([0, np.cos(theta)], [0, np.sin(theta)])
+            self.pitch_text.set_text(f"Pitch (deg): {pitch:.3f}")
+
+        self.frames_drawn += 1
+        return self.artists
+
+    def set_view(self, window: float | None = None, offset: float | None = None) -> None:
+        """Change the span shown and how far before the newest sample it ends (s)."""
+        if window is not None:
+            self.window = max(window, 0.1)
+        if offset is not None:
+            self.offset = max(offset, 0.0)
+
+        self.ax1.set_xlim(-self.offset - self.window, -self.offset)
+        # The ticks changed, so the blitted background has to be redrawn
+        self.f.canvas.draw_idle()
+
+    def _on_scroll(self, event) -> None:
+        step = self.ZOOM_STEP if event.button == 'down' else 1 / self.ZOOM_STEP
+        self.set_view(window=self.window * step)
+
+    def _on_key(self, event) -> None:
+        if event.key == 'left':
+            self.set_view(offset=self.offset + self.window / 2)
+        elif event.key == 'right':
+            self.set_view(offset=self.offset - self.window / 2)
+        elif event.key == 'end':
+            self.set_view(offset=0.0)
+
+    def show(self) -> None:
+        """Animate the plot until its window is closed."""
+        self.f.canvas.mpl_connect('scroll_event', self._on_scroll)
+        self.f.canvas.mpl_connect('key_press_event', self._on_key)
+        self.animation = FuncAnimation(
+            self.f, self.update, interval=1000 / self.fps, blit=True, cache_frame_data=False
+        )
+        plt.show()
+
+
+def receive_telemetry(sock: socket.socket, plot: LivePlot, sensor: PitchSensorModel, logger) -> None:
+    """Convert every received sample to pitch and buffer it in the plot."""
+    reader = TelemetryReader(sock)
+    while True:
+        # Blocks until a whole frame is in, however the stream was split
+        missed = reader.samples_missed
+        try:
+            frame = reader.read_frame()
+        except ConnectionError:
+            logger.warning("Telemetry stream closed")
+            return
+
+        if reader.samples_missed > missed:
+            logger.warning(f"Missed {reader.samples_missed - missed} telemetry samples")
+
+        # Map voltage to pitch angle, in place on a float64 copy of the first channel
+        voltage = frame.records['linear_potentiometer'][:, 0].astype(float)
+        plot.add(frame.records['timestamp'], sensor.to_pitch(voltage, out=voltage))
 
 
 if __name__ == "__main__":
-    volt_min = -4.262
-    volt_max = -1.48
-    extension_min = 0 # inches
-    extension_max = 11.25 # inches
-    sensor_mount_height = 27.75 # inches
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default=None, help="telemetry publisher address (default: hostname)")
+    parser.add_argument("--port", type=int, default=TELEMETRY_PORT)
+    parser.add_argument("--window", type=float, default=10.0, help="seconds of history shown")
+    parser.add_argument("--fps", type=float, default=30.0, help="redraw rate")
+    args = parser.parse_args()
 
-    xs = []
-    ys = []
-    queue_len = 50
-    init_time = time.time()
-    f, (ax1, ax2) = plt.subplots(1, 2)
+    logger = init_logger("DataPlotter")
+    sensor = PitchSensorModel()
+    plot = LivePlot(window=args.window, fps=args.fps)
 
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.connect((socket.gethostname(), 6969))
+    sock = socket.create_connection((args.host if args.host is not None else socket.gethostname(), args.port))
 
-    recv_size = sys.getsizeof(struct.pack('d', float(0)))
+    # Samples are received at the data rate while the plot redraws at its own rate
+    receive_t = threading.Thread(target=receive_telemetry, args=(sock, plot, sensor, logger))
+    receive_t.daemon = True
+    receive_t.start()
 
-    while True:
-        raw_bytes = sock.recv(recv_size)
-        try:
-            data = struct.unpack('d', raw_bytes)[0]
-        except:
-            continue
-
-        if data == 0:
-            continue
-        
-        # Map voltage to linear extension
-        linear_data = np.interp(data, [volt_min, volt_max], [extension_min, extension_max])
-
-        # Map linear extension to pitch angle
-        pitch = np.rad2deg(linear_data / sensor_mount_height)
-
-        # Set x and y values
-        xs.append(time.time() - init_time)  # Appending live plot timer
-        ys.append(pitch)                    # Appending pitch
-
-        # Implement window size
-        xs = xs[-queue_len:]
-        ys = ys[-queue_len:]
-
-        # Animating pitch over time
-        ax1.cla()
-        ax1.plot(xs, ys, color='green')
-        ax1.set_title('Measured Pitch')
-        ax1.set_ylabel('Pitch (deg)')
-        ax1.set_xlabel('Time (s)')
-        # ax1.set(ylim=(0, 20))
-
-        # Animating pitch frame
-        c, s = np.cos(pitch), np.sin(pitch)
-        R = np.array(((c, -s), (s, c)))
-        x = [0]
-        y = [0]
-        point = np.array([1, 0])
-        point_rot = R * point
-        
-        x.append(point_rot[0][0])
-        y.append(point_rot[1][0])
-        
-        ax2.cla()
-        ax2.set(xlim=(0, 1), ylim=(0, 1))
-        ax2.plot(x, y, color='blue')
-        ax2.legend([f"Pitch (deg): {round(pitch, 3)}"])
-        ax2.set_title('Pitching Frame')
-        ax2.set_ylabel('z')
-        ax2.set_xlabel('x')
-
-        plt.pause(0.01)
\ No newline at end of file
+    plot.show()
@@ -1,17 +1,60 @@
-import socket
+"""Publish synthetic telemetry for testing the live viewers without the arm or DAQ.
+
+The joints sweep slowly and each DAQ channel follows the fake DAQ signal, published at
+the given rate through the same TelemetryPublisher as pitch_compliance, so any number
+of data_plotter windows can connect and disconnect while it runs.
+
+Usage:
+    python data_writer.py [--rate 100] [--channels 1] [--batch-size 10] [--port 6969]
+"""
+
+import argparse
+import time
+
 import numpy as np
-import struct
-from time import sleep
+
+from fake_nidaqmx import default_signal
+from logger import init_logger
+from rate_scheduler import RateScheduler
+from telemetry import TELEMETRY_PORT, TelemetryEncoder, TelemetryPublisher
+
+
+def synthetic_sample(t: float, num_joints: int = 7, num_channels: int = 1):
+    """Get the joint positions and DAQ voltages of the synthetic stream at time t (s)."""
+    joints = 0.5 * np.sin(2 * np.pi * 0.05 * t + np.arange(num_joints))
+    channels = [float(default_signal(channel, np.array([t]))[0]) for channel in range(num_channels)]
+    return joints, channels
 
 
 if __name__ == "__main__":
-    
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-        sock.bind((socket.gethostname(), 6969))
-        sock.listen()
-        conn, addr = sock.accept()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rate", type=float, default=100.0, help="samples per second")
+    parser.add_argument("--channels", type=int, default=1, help="DAQ channels per sample")
+    parser.add_argument("--batch-size", type=int, default=10, help="samples per frame")
+    parser.add_argument("--host", default=None, help="address to listen on (default: hostname)")
+    parser.add_argument("--port", type=int, default=TELEMETRY_PORT)
+    args = parser.parse_args()
+
+    logger = init_logger("DataWriter")
+
+    telemetry = TelemetryEncoder(num_channels=args.channels, batch_size=args.batch_size)
+    publisher = TelemetryPublisher(args.host, args.port)
+    publisher.start()
+    logger.info(f"Publishing synthetic telemetry on {publisher.address} at {args.rate} Hz")
+
+    scheduler = RateScheduler(args.rate)
+    start = time.time()
+    try:
         while True:
-            for datapoint in np.append(np.linspace(0, 2*np.pi, 10), np.linspace(2*np.pi, 0, 10)):
-                raw_bytes = struct.pack('d', datapoint)
-                conn.send(raw_bytes)
-                sleep(0.1)
+            now = time.time()
+            joints, channels = synthetic_sample(now - start, num_channels=args.channels)
+
+            frame = telemetry.add(now, joints, channels)
+            if frame is not None:
+                publisher.publish(frame)
+
+            scheduler.wait()
+
+    except KeyboardInterrupt:
+        publisher.stop()
+        logger.info(f"Telemetry stats: {publisher.stats()}")
@@ -0,0 +1,153 @@
+"""Stand-in for the parts of nidaqmx used by NI_Device, for running without a DAQ."""
+
+import time
+import types
+from enum import Enum
+
+import numpy as np
+
+from daq_reader import expand_channels
+
+
+class TerminalConfiguration(Enum):
+    DEFAULT = -1
+    RSE = 10083
+    NRSE = 10078
+    DIFF = 10106
+
+
+class AcquisitionType(Enum):
+    FINITE = 10178
+    CONTINUOUS = 10123
+
+
+def default_signal(channel: int, t: np.ndarray) -> np.ndarray:
+    """Slow sinusoid inside the linear potentiometer's voltage range."""
+    return -2.87 + 1.2 * np.sin(2 * np.pi * 0.2 * t + channel)
+
+
+class _AIChannels:
+    def __init__(self) -> None:
+        self.channel_names: list[str] = []
+
+    def add_ai_voltage_chan(self, physical_channel: str, terminal_config=None, **kwargs) -> None:
+        self.channel_names.extend(expand_channels(physical_channel))
+
+
+class _Timing:
+    def __init__(self) -> None:
+        self.samp_clk_rate = None
+        self.samp_quant_samp_mode = AcquisitionType.FINITE
+        self.samp_quant_samp_per_chan = 1000
+
+    def cfg_samp_clk_timing(
+        self, rate: float, source: str = "", active_edge=None, sample_mode=AcquisitionType.FINITE,
+        samps_per_chan: int = 1000
+    ) -> None:
+        self.samp_clk_rate = rate
+        self.samp_quant_samp_mode = sample_mode
+        self.samp_quant_samp_per_chan = samps_per_chan
+
+
+class _InStream:
+    def __init__(self, task: "FakeTask") -> None:
+        self._task = task
+
+
+class FakeTask:
+    """A DAQ task that synthesizes samples instead of talking to hardware."""
+
+    def __init__(self, backend: "FakeNIDAQmx") -> None:
+        self._backend = backend
+        self.ai_channels = _AIChannels()
+        self.timing = _Timing()
+        self.in_stream = _InStream(self)
+
+        self._start_time = None
+        self._samples_read = 0
+
+    def __enter__(self) -> "FakeTask":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def start(self) -> None:
+        self._start_time = time.time()
+        self._samples_read = 0
+
+    def stop(self) -> None:
+        self._start_time = None
+
+    def close(self) -> None:
+        self.stop()
+
+    def read(self, number_of_samples_per_channel: int = 1, timeout: float = 10.0):
+        """Read samples in the same nested-list layout nidaqmx returns."""
+        num_channels = len(self.ai_channels.channel_names)
+        data = np.zeros((num_channels, number_of_samples_per_channel))
+        self._fill(data, number_of_samples_per_channel)
+
+        if num_channels == 1:
+            return data[0].tolist()
+        return data.tolist()
+
+    def _fill(self, data: np.ndarray, n: int) -> None:
+        if self._start_time is None:
+            self.start()
+
+        rate = self.timing.samp_clk_rate
+        if rate is None:
+            # On-demand reads are sampled immediately
+            t = np.full(n, time.time() - self._start_time)
+        else:
+            t = (self._samples_read + np.arange(n)) / rate
+
+            # Block until the sample clock would have produced the requested samples
+            if self._backend.realtime:
+                ready_at = self._start_time + (self._samples_read + n) / rate
+                delay = ready_at - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+
+        for channel in range(data.shape[0]):
+            data[channel, :n] = self._backend.signal(channel, t)
+
+        self._samples_read += n
+
+
+class AnalogMultiChannelReader:
+    def __init__(self, task_in_stream: _InStream) -> None:
+        self._task = task_in_stream._task
+
+    def read_many_sample(
+        self, data: np.ndarray, number_of_samples_per_channel: int = 1, timeout: float = 10.0
+    ) -> int:
+        self._task._fill(data, number_of_samples_per_channel)
+        return number_of_samples_per_channel
+
+
+class FakeNIDAQmx:
+    """Drop-in replacement for the nidaqmx module.
+
+    Pass an instance as the ``backend`` of an NI_Device to run it without hardware.
+    """
+
+    constants = types.SimpleNamespace(
+        TerminalConfiguration=TerminalConfiguration, AcquisitionType=AcquisitionType
+    )
+    stream_readers = types.SimpleNamespace(AnalogMultiChannelReader=AnalogMultiChannelReader)
+
+    def __init__(self, signal=default_signal, realtime: bool = True) -> None:
+        """Create a new fake backend.
+
+        Args:
+            signal: Callable mapping a channel index and an array of sample times (s) to
+                voltages.
+            realtime: Whether clocked reads block until their samples would exist.
+        """
+        self.signal = signal
+        self.realtime = realtime
+
+    def Task(self, new_task_name: str = "") -> FakeTask:
+        return FakeTask(self)
@@ -0,0 +1,145 @@
+"""Bounded-memory, multi-resolution history of a live signal.
+
+Level 0 keeps the newest samples at full rate. Each further level keeps buckets that
+summarise `factor` buckets of the level below by their min, max, and mean, so level k
+reaches factor**k times further back for the same memory. A view of any time span is
+served from the finest level that still covers it within a point budget, with the newest
+edge filled in from the finer levels that have not rolled up into a bucket yet.
+"""
+
+import numpy as np
+
+from ring_buffer import RingBuffer
+
+# Channels of the bucket levels
+MIN, MAX, MEAN, END = range(4)
+
+
+class MultiResolutionHistory:
+    """Min/max/mean pyramid of ring buffers.
+
+    One thread may extend the history while others view it.
+    """
+
+    def __init__(self, capacity: int = 4096, factor: int = 4, num_levels: int = 7) -> None:
+        """Create a new history.
+
+        With the defaults and 500 Hz samples, level 0 holds the last 8 s and the coarsest
+        level about 9 h, in about 1 MB.
+
+        Args:
+            capacity: The number of samples or buckets kept per level.
+            factor: How many buckets of a level make up one bucket of the next.
+            num_levels: The number of levels, including the full-rate one.
+        """
+        if factor < 2:
+            raise ValueError("factor must be at least 2")
+
+        self.capacity = capacity
+        self.factor = factor
+        self.levels = [RingBuffer(capacity)] + [RingBuffer(capacity, num_channels=4) for _ in range(num_levels - 1)]
+
+        # Per level, the entries of the level below that do not fill a bucket yet, as
+        # (start time, min, max, mean, end time) columns
+        self._pending = [np.zeros((5, 0)) for _ in range(num_levels - 1)]
+
+    def __len__(self) -> int:
+        return self.levels[0].total_written
+
+    def extend(self, timestamps, values) -> None:
+        """Append samples.
+
+        Args:
+            timestamps: The increasing sample times (s), shape (n,).
+            values: The sample values, shape (n,).
+        """
+        timestamps = np.asarray(timestamps, dtype=float)
+        values = np.asarray(values, dtype=float)
+        if len(timestamps) == 0:
+            return
+
+        self.levels[0].extend(timestamps, values.reshape(1, -1))
+
+        # Full-rate samples are buckets of one
+        entries = np.stack((timestamps, values, values, values, timestamps))
+        for level in range(1, len(self.levels)):
+            entries = self._roll_up(level, entries)
+            if entries.shape[1] == 0:
+                break
+
+    def _roll_up(self, level: int, entries: np.ndarray) -> np.ndarray:
+        entries = np.concatenate((self._pending[level - 1], entries), axis=1)
+        num_buckets = entries.shape[1] // self.factor
+        used = num_buckets * self.factor
+        self._pending[level - 1] = entries[:, used:]
+
+        groups = entries[:, :used].reshape(5, num_buckets, self.factor)
+        buckets = np.stack(
+            (
+                groups[0, :, 0],
+                groups[1].min(axis=1),
+                groups[2].max(axis=1),
+                # Buckets of a level all span the same number of samples
+                groups[3].mean(axis=1),
+                groups[4, :, -1],
+            )
+        )
+        self.levels[level].extend(buckets[0], buckets[1:])
+        return buckets
+
+    def latest(self) -> tuple[float, float] | None:
+        """Get the newest sample as (time, value), or None if there is none."""
+        latest = self.levels[0].latest()
+        return None if latest is None else (latest[0], float(latest[1][0]))
+
+    def _since(self, level: int, t: float) -> np.ndarray:
+        """Get a level's entries newer than t as (start, min, max, mean, end) rows."""
+        times, values = self.levels[level].since(t)
+        if level == 0:
+            return np.stack((times, values[0], values[0], values[0], times))
+        return np.vstack((times, values))
+
+    def _covers(self, level: int, num_since: int) -> bool:
+        # A level covers a start time if it still holds something older, or never lost anything
+        ring = self.levels[level]
+        return num_since < len(ring) or ring.total_written <= ring.capacity
+
+    def select_level(self, t_start: float, t_end: float | None = None, max_points: int = 2000) -> int:
+        """Get the finest level that covers [t_start, t_end] in at most max_points points."""
+        for level in range(len(self.levels)):
+            times = self._since(level, t_start)[0]
+            if not self._covers(level, len(times)):
+                continue
+
+            num_points = len(times) if t_end is None else np.searchsorted(times, t_end, side="right")
+            if num_points <= max_points:
+                return level
+
+        return len(self.levels) - 1
+
+    def view(self, t_start: float, t_end: float | None = None, max_points: int = 2000):
+        """Get the history over a time span at the resolution that suits it.
+
+        Args:
+            t_start: The start of the span (s).
+            t_end: The end of the span (s); defaults to the newest sample.
+            max_points: The most points wanted, e.g. about the pixel width of the plot.
+
+        Returns:
+            The level used and the time (s), min, max, and mean of each point.
+        """
+        level = self.select_level(t_start, t_end, max_points)
+
+        # Coarse buckets first, then the finer entries that came after the last of them
+        pieces = []
+        t_from = t_start
+        for finer in range(level, -1, -1):
+            entries = self._since(finer, t_from)
+            if entries.shape[1]:
+                pieces.append(entries)
+                t_from = entries[1 + END, -1]
+
+        rows = np.concatenate(pieces, axis=1) if pieces else np.zeros((5, 0))
+        if t_end is not None:
+            rows = rows[:, rows[0] <= t_end]
+        return level, rows[0], rows[1 + MIN], rows[1 + MAX], rows[1 + MEAN]
@@ -0,0 +1,163 @@
+from collections import deque
+from typing import NamedTuple
+
+import numpy as np
+
+import clock
+
+# How long a request may go unanswered before it counts as lost (s)
+DEFAULT_RESPONSE_TIMEOUT = 0.1
+
+
+class JointSnapshot(NamedTuple):
+    """A complete set of joint positions from one request cycle.
+
+    The timestamp is the arrival time of the cycle's last joint on the common clock.
+    """
+
+    sequence: int
+    timestamp: float
+    positions: np.ndarray
+    latency: float
+
+
+class JointStateStore:
+    """Assembles joint position packets into complete, consistent snapshots.
+
+    Packets are staged privately by the callback thread, and once every joint of a
+    response has arrived the snapshot is published by swapping a single reference.
+    Readers on other threads therefore always see the joints of one response without
+    taking a lock.
+
+    Requests may be sent faster than they are answered, so the send times of the
+    outstanding requests are queued and each completed response is matched to the oldest
+    of them. Responses carry no request ID, so one that is lost entirely shifts the
+    matching by a request; the request is dropped as lost once it has gone unanswered
+    for response_timeout, which bounds how long the latencies after it read high.
+    """
+
+    def __init__(
+        self,
+        num_joints: int = 7,
+        response_timeout: float = DEFAULT_RESPONSE_TIMEOUT,
+        max_outstanding: int = 64,
+        max_response_spread: float = 0.005,
+    ) -> None:
+        """Create a new joint state store.
+
+        Args:
+            num_joints: The number of joints that make up a complete snapshot.
+            response_timeout: How long a request may go unanswered before it counts as
+                lost (s).
+            max_outstanding: The most unanswered requests remembered.
+            max_response_spread: The longest time between the first and last joint of
+                one response (s); a joint arriving later starts a new response.
+        """
+        self.num_joints = num_joints
+        self.response_timeout = response_timeout
+        self.max_response_spread = max_response_spread
+        self._complete_mask = (1 << num_joints) - 1
+
+        # Only ever touched by the thread calling update()
+        self._staging = np.zeros(num_joints)
+        self._received = 0
+        self._last_idx = -1
+        self._first_arrival = 0.0
+
+        # Send times of the unanswered requests, oldest first. begin_cycle() only appends
+        # and update() only pops, which deque does atomically
+        self._requests: deque[float] = deque(maxlen=max_outstanding)
+
+        positions = np.zeros(num_joints)
+        positions.flags.writeable = False
+        self._snapshot = JointSnapshot(0, 0.0, positions, float("nan"))
+
+        self.completed_cycles = 0
+        self.incomplete_cycles = 0
+        self.lost_requests = 0
+        self._latency_count = 0
+        self._latency_sum = 0.0
+        self._latency_max = 0.0
+
+    def begin_cycle(self) -> None:
+        """Mark that a new position request has been sent."""
+        self._requests.append(clock.now())
+
+    def _answer_request(self, arrival_time: float) -> float | None:
+        """Pop the send time of the oldest request still awaiting an answer, if any."""
+        while True:
+            try:
+                request_time = self._requests.popleft()
+            except IndexError:
+                return None
+
+            if arrival_time - request_time <= self.response_timeout:
+                return request_time
+            self.lost_requests += 1
+
+    def update(self, joint_idx: int, position: float) -> None:
+        """Stage a joint position and publish a snapshot once the response is complete.
+
+        Args:
+            joint_idx: The zero-based index of the joint.
+            position: The joint position.
+        """
+        arrival_time = clock.now()
+
+        # Joints answer in device order, close together. A joint that does not come after
+        # the staged ones, or comes too long after the first of them, belongs to the next
+        # response, so the staged one lost some of its joints; drop it, and its request,
+        # so that it cannot leak into the next one
+        if self._received and (
+            joint_idx <= self._last_idx or arrival_time - self._first_arrival > self.max_response_spread
+        ):
+            self.incomplete_cycles += 1
+            self._received = 0
+            self._answer_request(arrival_time)
+
+        if not self._received:
+            self._first_arrival = arrival_time
+        self._staging[joint_idx] = position
+        self._received |= 1 << joint_idx
+        self._last_idx = joint_idx
+
+        if self._received != self._complete_mask:
+            return
+
+        request_time = self._answer_request(arrival_time)
+        latency = arrival_time - request_time if request_time is not None else float("nan")
+
+        positions = self._staging.copy()
+        positions.flags.writeable = False
+        self._snapshot = JointSnapshot(self._snapshot.sequence + 1, arrival_time, positions, latency)
+        self._received = 0
+
+        self.completed_cycles += 1
+        if request_time is not None:
+            self._latency_count += 1
+            self._latency_sum += latency
+            self._latency_max = max(self._latency_max, latency)
+
+    def cycle_pending(self) -> bool:
+        """Whether a request is still waiting for its response."""
+        try:
+            oldest = self._requests[0]
+        except IndexError:
+            return False
+        return clock.now() - oldest <= self.response_timeout
+
+    def snapshot(self) -> JointSnapshot:
+        """Get the most recently completed joint snapshot."""
+        return self._snapshot
+
+    def latency_stats(self) -> dict:
+        """Get the request-to-completion latency statistics (s) of the completed cycles."""
+        count = self._latency_count
+        return {
+            "completed": self.completed_cycles,
+            "incomplete": self.incomplete_cycles,
+            "lost": self.lost_requests,
+            "last": self._snapshot.latency,
+            "mean": self._latency_sum / count if count else float("nan"),
+            "max": self._latency_max,
+        }
@@ -0,0 +1,170 @@
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+
+def rpy_to_matrix(roll: float, pitch: float, yaw: float) -> np.ndarray:
+    """Get the rotation matrix of a URDF roll-pitch-yaw (fixed-axis XYZ) rotation."""
+    cr, sr = np.cos(roll), np.sin(roll)
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    cy, sy = np.cos(yaw), np.sin(yaw)
+
+    return np.array(
+        [
+            [cy * cp, cy * sp * sr - sy * cr, cy * sp * cr + sy * sr],
+            [sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr],
+            [-sp, cp * sr, cp * cr],
+        ]
+    )
+
+
+def axis_angle_matrices(axis: np.ndarray, angles: np.ndarray) -> np.ndarray:
+    """Get the rotation matrices about a unit axis for a batch of angles.
+
+    Args:
+        axis: The unit rotation axis, shape (3,).
+        angles: The rotation angles (rad), shape (N,).
+
+    Returns:
+        The rotation matrices, shape (N, 3, 3).
+    """
+    x, y, z = axis
+    skew = np.array([[0.0, -z, y], [z, 0.0, -x], [-y, x, 0.0]])
+    skew_sq = skew @ skew
+
+    # Rodrigues' formula, broadcast over the batch
+    s = np.sin(angles)[:, None, None]
+    c = np.cos(angles)[:, None, None]
+    return np.eye(3) + s * skew + (1.0 - c) * skew_sq
+
+
+def matrix_to_quaternion(rot: np.ndarray) -> np.ndarray:
+    """Convert a batch of rotation matrices to unit quaternions.
+
+    Args:
+        rot: The rotation matrices, shape (N, 3, 3).
+
+    Returns:
+        The quaternions in kinpy's (w, x, y, z) order, shape (N, 4).
+    """
+    m00, m11, m22 = rot[:, 0, 0], rot[:, 1, 1], rot[:, 2, 2]
+
+    # Compute all four candidate solutions and keep the numerically largest one per row
+    candidates = np.stack(
+        [
+            np.stack([1 + m00 + m11 + m22, rot[:, 2, 1] - rot[:, 1, 2], rot[:, 0, 2] - rot[:, 2, 0], rot[:, 1, 0] - rot[:, 0, 1]], -1),
+            np.stack([rot[:, 2, 1] - rot[:, 1, 2], 1 + m00 - m11 - m22, rot[:, 0, 1] + rot[:, 1, 0], rot[:, 0, 2] + rot[:, 2, 0]], -1),
+            np.stack([rot[:, 0, 2] - rot[:, 2, 0], rot[:, 0, 1] + rot[:, 1, 0], 1 - m00 + m11 - m22, rot[:, 1, 2] + rot[:, 2, 1]], -1),
+            np.stack([rot[:, 1, 0] - rot[:, 0, 1], rot[:, 0, 2] + rot[:, 2, 0], rot[:, 1, 2] + rot[:, 2, 1], 1 - m00 - m11 + m22], -1),
+        ],
+        axis=1,
+    )
+    best = np.argmax(np.stack([m00 + m11 + m22, m00, m11, m22], -1), axis=1)
+    quat = candidates[np.arange(len(rot)), best]
+    quat /= np.linalg.norm(quat, axis=1, keepdims=True)
+
+    # Use the same hemisphere convention for every row
+    quat *= np.where(quat[:, :1] < 0, -1.0, 1.0)
+    return quat
+
+
+def _parse_origin(joint: ET.Element) -> tuple[np.ndarray, np.ndarray]:
+    origin = joint.find("origin")
+    if origin is None:
+        return np.eye(3), np.zeros(3)
+
+    xyz = np.array([float(v) for v in origin.get("xyz", "0 0 0").split()])
+    rpy = [float(v) for v in origin.get("rpy", "0 0 0").split()]
+    return rpy_to_matrix(*rpy), xyz
+
+
+class BatchedFK:
+    """Vectorized forward kinematics for a serial chain described in a URDF."""
+
+    def __init__(self, urdf_fp: str = "urdf/bravo7.urdf", end_link: str = "ee_link") -> None:
+        """Precompute the joint transforms along the chain ending at end_link.
+
+        Args:
+            urdf_fp: The path to the URDF.
+            end_link: The link whose pose is computed.
+        """
+        root = ET.parse(urdf_fp).getroot()
+        joints_by_child = {j.find("child").get("link"): j for j in root.iter("joint")}
+
+        # Walk from the end link back to the root link
+        chain = []
+        link = end_link
+        while link in joints_by_child:
+            joint = joints_by_child[link]
+            chain.append(joint)
+            link = joint.find("parent").get("link")
+        chain.reverse()
+
+        # Fold every fixed joint into the origin of the next movable joint, so that a
+        # batch only pays for one constant transform per degree of freedom
+        self.joint_names = []
+        self._joints = []
+        rot, pos = np.eye(3), np.zeros(3)
+        for joint in chain:
+            origin_rot, origin_pos = _parse_origin(joint)
+            pos = pos + rot @ origin_pos
+            rot = rot @ origin_rot
+
+            joint_type = joint.get("type")
+            if joint_type == "fixed":
+                continue
+
+            axis_elem = joint.find("axis")
+            axis = np.array([float(v) for v in axis_elem.get("xyz").split()]) if axis_elem is not None else np.array([1.0, 0.0, 0.0])
+            axis /= np.linalg.norm(axis)
+
+            self.joint_names.append(joint.get("name"))
+            self._joints.append((joint_type, rot, pos, axis))
+            rot, pos = np.eye(3), np.zeros(3)
+
+        self._tail = (rot, pos)
+        self.dof = len(self.joint_names)
+
+    def forward_kinematics(
+        self, joint_angles: np.ndarray, rotations: bool = False, quaternions: bool = False
+    ) -> np.ndarray | tuple[np.ndarray, ...]:
+        """Compute the end link poses for a batch of joint configurations.
+
+        Args:
+            joint_angles: The joint values in chain order from the root, shape (N, dof).
+                Any extra trailing columns are ignored, as kinpy does.
+            rotations: Also return the rotation matrices, shape (N, 3, 3).
+            quaternions: Also return (w, x, y, z) quaternions, shape (N, 4).
+
+        Returns:
+            The end link positions, shape (N, 3), followed by the requested rotations
+            and quaternions.
+        """
+        joint_angles = np.asarray(joint_angles, dtype=np.float64)
+        num_poses = len(joint_angles)
+
+        rot = np.broadcast_to(np.eye(3), (num_poses, 3, 3))
+        pos = np.zeros((num_poses, 3))
+
+        for i, (joint_type, origin_rot, origin_pos, axis) in enumerate(self._joints):
+            pos = pos + rot @ origin_pos
+            rot = rot @ origin_rot
+
+            if joint_type == "prismatic":
+                pos = pos + joint_angles[:, i, None] * (rot @ axis)
+            else:
+                rot = rot @ axis_angle_matrices(axis, joint_angles[:, i])
+
+        tail_rot, tail_pos = self._tail
+        pos = pos + rot @ tail_pos
+        rot = rot @ tail_rot
+
+        if not (rotations or quaternions):
+            return pos
+
+        result = (pos,)
+        if rotations:
+            result += (rot,)
+        if quaternions:
+            result += (matrix_to_quaternion(rot),)
+        return result
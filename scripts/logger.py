@@ -1,5 +1,11 @@
+import atexit
+import json
 import logging
 import os
+import struct
+import threading
+import time
+from collections import deque
 from datetime import datetime
 
 import numpy as np
@@ -13,27 +19,294 @@ def init_logger(name: str, log_level: int = logging.INFO) -> logging.Logger:
     return logger
 
 
-class FileLogger:
-    """File logging handler."""
+# Binary log header: magic, format version, number of joints, number of DAQ channels
+BINARY_LOG_MAGIC = b"BRAVOLOG"
+BINARY_LOG_VERSION = 1
+BINARY_LOG_HEADER = struct.Struct("<8sHHH")
+BINARY_LOG_HEADER_SIZE = 32
 
-    def __init__(self, filename: str | None = None) -> None:
-        log_dir = os.path.join(os.getcwd(), "logs")
 
-        if not os.path.isdir(log_dir):
-            os.mkdir(log_dir)
+def _log_path(filename: str | None, extension: str) -> str:
+    log_dir = os.path.join(os.getcwd(), "logs")
 
-        if filename is None:
-            filename = os.path.join(
-                log_dir, f"{datetime.now().strftime('%Y-%m-%d-%H-%M-%S')}.log"
-            )
-        else:
-            filename = os.path.join(log_dir, filename)
+    if not os.path.isdir(log_dir):
+        os.mkdir(log_dir)
+
+    if filename is None:
+        filename = f"{datetime.now().strftime('%Y-%m-%d-%H-%M-%S')}{extension}"
+
+    return os.path.join(log_dir, filename)
+
+
+def binary_log_dtype(num_joints: int = 7, num_channels: int = 1) -> np.dtype:
+    """Get the fixed-width record layout of a binary log."""
+    return np.dtype(
+        [
+            ("timestamp", "<f8"),
+            ("joint_position", "<f4", (num_joints,)),
+            ("linear_potentiometer", "<f4", (num_channels,)),
+        ]
+    )
+
+
+def _binary_log_header(num_joints: int, num_channels: int) -> bytes:
+    header = bytearray(BINARY_LOG_HEADER_SIZE)
+    BINARY_LOG_HEADER.pack_into(
+        header, 0, BINARY_LOG_MAGIC, BINARY_LOG_VERSION, num_joints, num_channels
+    )
+    return bytes(header)
+
+
+def _parse_binary_log_header(header: bytes, filename: str) -> np.dtype:
+    magic, version, num_joints, num_channels = BINARY_LOG_HEADER.unpack_from(header)
+    if magic != BINARY_LOG_MAGIC:
+        raise ValueError(f"{filename} is not a binary Bravo log")
+    if version != BINARY_LOG_VERSION:
+        raise ValueError(f"Unsupported binary log version {version} in {filename}")
+
+    return binary_log_dtype(num_joints, num_channels)
+
+
+# Segment file suffix of each supported compression
+COMPRESSION_EXTENSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"}
+MANIFEST_EXTENSION = ".manifest.json"
+
+
+def _compression_of(filename: str) -> str | None:
+    for compression, extension in COMPRESSION_EXTENSIONS.items():
+        if extension and filename.endswith(extension):
+            return compression
+    return None
+
+
+def open_log_file(filename: str, mode: str, compression: str | None = None):
+    """Open a log file, compressing or decompressing it as a stream.
+
+    Args:
+        filename: The path to the file.
+        mode: The file mode, e.g. "wt" or "rb".
+        compression: None, "gzip", or "zstd"; inferred from the extension if None.
+    """
+    if compression is None:
+        compression = _compression_of(filename)
+
+    if compression is None:
+        return open(filename, mode)
+    if compression == "gzip":
+        import gzip
+        return gzip.open(filename, mode)
+    if compression == "zstd":
+        # Optional dependency, only needed for zstd-compressed logs
+        import zstandard
+        return zstandard.open(filename, mode)
+
+    raise ValueError(f"Unsupported log compression {compression}")
+
+
+def log_segments(filename: str) -> list[str]:
+    """Get the files that make up a log, in order.
+
+    A manifest written by SegmentedLogFile expands to its segments; any other log is
+    its own single segment.
+    """
+    if not filename.endswith(MANIFEST_EXTENSION):
+        return [filename]
+
+    with open(filename, "r") as file:
+        manifest = json.load(file)
+
+    log_dir = os.path.dirname(filename)
+    return [os.path.join(log_dir, segment["file"]) for segment in manifest["segments"]]
+
+
+def is_binary_log(filename: str) -> bool:
+    """Whether a log, segment, or manifest holds binary rather than text records."""
+    if filename.endswith(MANIFEST_EXTENSION):
+        filename = filename[:-len(MANIFEST_EXTENSION)]
+    return ".bin" in os.path.basename(filename)
+
+
+def read_log_text(filename: str) -> str:
+    """Read a text log as one string, joining and decompressing its segments.
+
+    Only the first segment's header line is kept.
+    """
+    parts = []
+    for i, segment in enumerate(log_segments(filename)):
+        with open_log_file(segment, "rt") as file:
+            if i > 0:
+                file.readline()
+            parts.append(file.read())
+    return "".join(parts)
+
+
+def read_binary_log(filename: str) -> np.ndarray:
+    """Load a binary log, mapping it into memory without copying where possible.
+
+    Uncompressed single-file logs are returned as an np.memmap. Compressed segments are
+    decompressed, and the segments of a manifest are concatenated.
 
-        self.log_file = open(filename, "w")  # type: ignore
+    Args:
+        filename: The path to a log or manifest written by BinaryFileLogger.
 
-        self.log_file.write(
-            "timestamp,joint_position,linear_potentiometer\n"
+    Returns:
+        A structured array with "timestamp", "joint_position", and
+        "linear_potentiometer" fields.
+    """
+    segments = log_segments(filename)
+    if len(segments) != 1:
+        return np.concatenate([read_binary_log(segment) for segment in segments])
+
+    filename = segments[0]
+    if _compression_of(filename) is not None:
+        with open_log_file(filename, "rb") as file:
+            data = file.read()
+
+        dtype = _parse_binary_log_header(data[:BINARY_LOG_HEADER_SIZE], filename)
+        num_records = (len(data) - BINARY_LOG_HEADER_SIZE) // dtype.itemsize
+        return np.frombuffer(data, dtype=dtype, count=num_records, offset=BINARY_LOG_HEADER_SIZE)
+
+    with open(filename, "rb") as file:
+        header = file.read(BINARY_LOG_HEADER_SIZE)
+
+    dtype = _parse_binary_log_header(header, filename)
+    num_records = (os.path.getsize(filename) - BINARY_LOG_HEADER_SIZE) // dtype.itemsize
+
+    # A record cut short by a crash is left out rather than misread
+    if num_records == 0:
+        return np.zeros(0, dtype=dtype)
+
+    return np.memmap(
+        filename, dtype=dtype, mode="r", offset=BINARY_LOG_HEADER_SIZE, shape=(num_records,)
+    )
+
+
+class SegmentedLogFile:
+    """Writes a log as a series of rotating, optionally compressed segment files.
+
+    Segments are named like "run.000.bin.gz" and each starts with the log header, so
+    every one is readable on its own. A "run.bin.manifest.json" file lists them in order
+    and is rewritten whenever a segment is opened or closed. Rotation happens between
+    writes, so records are never split across segments. Compression runs on whichever
+    thread writes, so pair this with AsyncFileLogger to keep it off the control loop.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        header: str | bytes,
+        segment_bytes: int | None = None,
+        segment_seconds: float | None = None,
+        compression: str | None = None,
+    ) -> None:
+        """Create a new segmented log.
+
+        Args:
+            filename: The path of the logical log; segments are written next to it.
+            header: The header written at the start of every segment.
+            segment_bytes: Rotate once a segment holds this many uncompressed bytes.
+            segment_seconds: Rotate once a segment has been open this long (s).
+            compression: None, "gzip", or "zstd".
+        """
+        if compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError(f"Unsupported log compression {compression}")
+
+        self.header = header
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.compression = compression
+        self._mode = "wb" if isinstance(header, bytes) else "wt"
+
+        self._root, self._extension = os.path.splitext(filename)
+        self.manifest_path = f"{filename}{MANIFEST_EXTENSION}"
+        self._segments: list[dict] = []
+
+        self._file = None
+        self._segment_size = 0
+        self._segment_opened = 0.0
+
+    def write(self, data: str | bytes) -> None:
+        if self._file is None:
+            self._open_segment()
+
+        self._file.write(data)
+        self._segment_size += len(data)
+
+        if (self.segment_bytes is not None and self._segment_size >= self.segment_bytes) or (
+            self.segment_seconds is not None
+            and time.monotonic() - self._segment_opened >= self.segment_seconds
+        ):
+            self._close_segment()
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._close_segment()
+
+    def _open_segment(self) -> None:
+        name = (
+            f"{os.path.basename(self._root)}.{len(self._segments):03d}{self._extension}"
+            f"{COMPRESSION_EXTENSIONS[self.compression]}"
+        )
+        self._file = open_log_file(
+            os.path.join(os.path.dirname(self._root), name), self._mode, self.compression
         )
+        self._file.write(self.header)
+
+        self._segment_size = 0
+        self._segment_opened = time.monotonic()
+        self._segments.append({"file": name, "start_time": time.time(), "end_time": None, "bytes": 0})
+        self._write_manifest()
+
+    def _close_segment(self) -> None:
+        self._file.close()
+        self._file = None
+
+        self._segments[-1]["end_time"] = time.time()
+        self._segments[-1]["bytes"] = self._segment_size
+        self._write_manifest()
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            "format": "binary" if self._mode == "wb" else "text",
+            "compression": self.compression,
+            "segments": self._segments,
+        }
+
+        # Replace atomically so a reader never sees a half-written manifest
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(manifest, file, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+
+class FileLogger:
+    """File logging handler.
+
+    Setting segment_bytes, segment_seconds, or compression splits the log into rotating
+    segments listed in a manifest (see SegmentedLogFile).
+    """
+
+    def __init__(
+        self,
+        filename: str | None = None,
+        segment_bytes: int | None = None,
+        segment_seconds: float | None = None,
+        compression: str | None = None,
+    ) -> None:
+        filename = _log_path(filename, ".log")
+        header = "timestamp,joint_position,linear_potentiometer\n"
+
+        if segment_bytes is None and segment_seconds is None and compression is None:
+            self.log_file = open(filename, "w")  # type: ignore
+            self.log_file.write(header)
+        else:
+            self.log_file = SegmentedLogFile(
+                filename, header, segment_bytes, segment_seconds, compression
+            )
 
         return
 
@@ -43,8 +316,200 @@ class FileLogger:
         joint_positions: np.ndarray,
         linear_potentiometer: float,
     ) -> None:
-        self.log_file.write(
-            f"{timestamp},{joint_positions},{linear_potentiometer}\n"
+        self.log_file.write(self.encode(timestamp, joint_positions, linear_potentiometer))
+
+        return
+
+    def encode(
+        self,
+        timestamp: float,
+        joint_positions: np.ndarray,
+        linear_potentiometer: float,
+    ) -> str:
+        # Arrays are written as Python lists so the log keeps its comma-separated layout
+        if isinstance(joint_positions, np.ndarray):
+            joint_positions = joint_positions.tolist()
+        if isinstance(linear_potentiometer, np.ndarray):
+            linear_potentiometer = linear_potentiometer.tolist()
+
+        return f"{timestamp},{joint_positions},{linear_potentiometer}\n"
+
+    def close(self) -> None:
+        self.log_file.close()
+
+
+class BinaryFileLogger:
+    """Fixed-width binary file logging handler.
+
+    Each sample is one record of a float64 timestamp, float32 joint positions, and
+    float32 DAQ channels, readable with read_binary_log. Setting segment_bytes,
+    segment_seconds, or compression splits the log into rotating segments listed in a
+    manifest (see SegmentedLogFile).
+    """
+
+    def __init__(
+        self,
+        filename: str | None = None,
+        num_joints: int = 7,
+        num_channels: int = 1,
+        segment_bytes: int | None = None,
+        segment_seconds: float | None = None,
+        compression: str | None = None,
+    ) -> None:
+        filename = _log_path(filename, ".bin")
+
+        self.filename = filename
+        self.num_joints = num_joints
+        self.num_channels = num_channels
+        self._record = struct.Struct(f"<d{num_joints}f{num_channels}f")
+        self._buffer = bytearray(self._record.size)
+
+        header = _binary_log_header(num_joints, num_channels)
+        if segment_bytes is None and segment_seconds is None and compression is None:
+            self.log_file = open(filename, "wb")  # type: ignore
+            self.log_file.write(header)
+        else:
+            self.log_file = SegmentedLogFile(
+                filename, header, segment_bytes, segment_seconds, compression
+            )
+
+        return
+
+    def __call__(
+        self,
+        timestamp: float,
+        joint_positions: np.ndarray,
+        linear_potentiometer: float | list[float],
+    ) -> None:
+        if np.isscalar(linear_potentiometer):
+            linear_potentiometer = (linear_potentiometer,)
+
+        self._record.pack_into(
+            self._buffer, 0, timestamp, *joint_positions, *linear_potentiometer
         )
+        self.log_file.write(self._buffer)
 
         return
+
+    def encode(
+        self,
+        timestamp: float,
+        joint_positions: np.ndarray,
+        linear_potentiometer: float | list[float],
+    ) -> bytes:
+        if np.isscalar(linear_potentiometer):
+            linear_potentiometer = (linear_potentiometer,)
+
+        return self._record.pack(timestamp, *joint_positions, *linear_potentiometer)
+
+    def close(self) -> None:
+        self.log_file.close()
+
+
+class AsyncFileLogger:
+    """Moves the formatting and writing of a file logger onto a background thread.
+
+    Samples are handed over through a bounded deque, whose appends and pops are atomic,
+    so the caller never takes a lock or waits on the disk. When the queue is full new
+    samples are dropped and counted. The writer drains the queue in batches, writes each
+    batch with a single call, and flushes once enough bytes or time have accumulated.
+    Samples must not be modified after they are passed in.
+    """
+
+    def __init__(
+        self,
+        file_logger: FileLogger | BinaryFileLogger,
+        max_queued: int = 100_000,
+        batch_size: int = 1000,
+        flush_bytes: int = 1 << 20,
+        flush_interval: float = 1.0,
+    ) -> None:
+        """Create a new background writer.
+
+        Args:
+            file_logger: The logger that formats samples and owns the file.
+            max_queued: The most samples waiting to be written before new ones are dropped.
+            batch_size: The most samples formatted into a single write.
+            flush_bytes: Flush after this many bytes have been written.
+            flush_interval: Flush at least this often (s) while samples are arriving.
+        """
+        self._file_logger = file_logger
+        self.max_queued = max_queued
+        self.batch_size = batch_size
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+
+        self._queue: deque = deque()
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+
+        self._running = True
+        self.writer_t = threading.Thread(target=self._run)
+        self.writer_t.daemon = True
+        self.writer_t.start()
+
+        # Make sure that buffered samples reach the disk when we exit
+        atexit.register(self.close)
+
+    def __call__(
+        self,
+        timestamp: float,
+        joint_positions: np.ndarray,
+        linear_potentiometer: float | list[float],
+    ) -> None:
+        if len(self._queue) >= self.max_queued:
+            self.dropped += 1
+            return
+
+        self._queue.append((timestamp, joint_positions, linear_potentiometer))
+        self.queued += 1
+
+    def stats(self) -> dict:
+        """Get the number of queued, written, dropped, and still pending samples."""
+        return {
+            "queued": self.queued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "pending": len(self._queue),
+        }
+
+    def close(self) -> None:
+        """Write out every queued sample and close the file."""
+        if not self._running:
+            return
+
+        self._running = False
+        self.writer_t.join()
+        self._file_logger.close()
+
+    def _run(self) -> None:
+        log_file = self._file_logger.log_file
+        encode = self._file_logger.encode
+        empty = b"" if isinstance(self._file_logger, BinaryFileLogger) else ""
+
+        unflushed = 0
+        last_flush = time.monotonic()
+
+        # Keep going after close() until the queue has been drained
+        while self._running or self._queue:
+            batch = []
+            while self._queue and len(batch) < self.batch_size:
+                batch.append(encode(*self._queue.popleft()))
+
+            if batch:
+                data = empty.join(batch)
+                log_file.write(data)
+                unflushed += len(data)
+                self.written += len(batch)
+
+            if unflushed and (unflushed >= self.flush_bytes or time.monotonic() - last_flush >= self.flush_interval):
+                log_file.flush()
+                unflushed = 0
+                last_flush = time.monotonic()
+
+            # Polling keeps the producer side free of any signalling
+            if not batch:
+                time.sleep(0.01)
+
+        log_file.flush()
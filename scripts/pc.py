@@ -1,16 +1,12 @@
 import time
 import atexit
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
 import numpy as np
-import threading
-import socket
-import struct
 
 from logger import FileLogger, init_logger
 from daq_reader import NI_Device
 from bravo_handler import BravoHandler
 from config_loader import ArmConfig
+from sensor_model import PitchSensorModel
 # from live_plot2 import LivePlotter
 
 # from multiprocessing import Process,Queue,Pipe
@@ -86,11 +82,7 @@ if __name__ == "__main__":
     init_time = time.time()
     running_arm = True
 
-    volt_min = -4.262
-    volt_max = -1.48
-    extension_min = 0 # inches
-    extension_max = 11.25 # inches
-    sensor_mount_height = 27.75 # inches
+    sensor = PitchSensorModel()
 
     # Enable the controller
     pitch_compliance.enable()
@@ -104,11 +96,8 @@ if __name__ == "__main__":
                 pitch_compliance._ni_device.voltage_reading,
             )
 
-            # Map voltage to linear extension
-            linear_data = np.interp(pitch_compliance._ni_device.voltage_reading, [volt_min, volt_max], [extension_min, extension_max])
-
-            # Map linear extension to pitch angle
-            pitch = np.rad2deg(linear_data / sensor_mount_height)
+            # Map voltage to pitch angle
+            pitch = sensor.to_pitch(pitch_compliance._ni_device.voltage_reading)
             print(f"Pitch: {np.round(pitch, 3)}")
 
             if time.time() - init_time > 10 and running_arm:
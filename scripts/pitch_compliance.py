@@ -1,16 +1,19 @@
+import argparse
+import os
 import time
 import atexit
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
+from collections import deque
+
 import numpy as np
-import threading
-import socket
-import struct
 
-from logger import FileLogger, init_logger
+import clock
+from logger import AsyncFileLogger, BinaryFileLogger, init_logger
 from daq_reader import NI_Device
 from bravo_handler import BravoHandler
 from config_loader import ArmConfig
+from rate_scheduler import RateScheduler
+from telemetry import TelemetryEncoder, TelemetryPublisher
+from trajectory import TrajectoryExecutor, build_trajectory
 # from live_plot2 import LivePlotter
 
 # from multiprocessing import Process,Queue,Pipe
@@ -23,7 +26,8 @@ class PitchCompliance():
         self.desired_config = self._config_loader.desired_config
 
         self._bravo = BravoHandler()
-        self._ni_device = NI_Device()
+        # Streamed DAQ samples carry sample-clock timestamps on the common clock
+        self._ni_device = NI_Device(streaming=True)
 
         self._running = False
         # self.logger = init_logger("PitchCompliance")
@@ -36,6 +40,15 @@ class PitchCompliance():
         # Make sure that we shutdown the interface when we exit
         atexit.register(self.disable)
 
+    def sweep(self, config_nums, rate=50.0, max_joint_speed=0.2, dwell=30.0) -> TrajectoryExecutor:
+        """Stream a path through several configurations, holding each for dwell seconds."""
+        all_configs = self._config_loader.load_matfile_data()
+        setpoints, _ = build_trajectory(all_configs[config_nums], rate, max_joint_speed, dwell)
+
+        executor = TrajectoryExecutor(self._bravo, setpoints, rate)
+        executor.start()
+        return executor
+
     def enable(self) -> None:
         """Enable arm control and sensor readings."""
         self._running = True
@@ -74,43 +87,111 @@ class PitchCompliance():
     #         time.sleep(1)
 
 
-if __name__ == "__main__":    
-    config_num = int(input("Enter the desired configuration #: "))
+if __name__ == "__main__":
+    # All-day runs are split into hourly, compressed segments listed in a manifest
+    parser = argparse.ArgumentParser(description="Hold or sweep Bravo configurations while logging the frame pitch.")
+    parser.add_argument("--segment-bytes", type=int, default=None, help="rotate the log after this many uncompressed bytes")
+    parser.add_argument("--segment-seconds", type=float, default=3600.0, help="rotate the log after this many seconds (0: never)")
+    parser.add_argument("--compression", choices=["none", "gzip", "zstd"], default="gzip", help="compression of the log segments")
+    args = parser.parse_args()
+
+    # Several comma-separated configurations are swept in order, starting from home
+    config_nums = [int(num) for num in input("Enter the desired configuration #(s): ").split(",")]
+    config_num = config_nums[0]
     pitch_compliance = PitchCompliance(config_num)
 
     logger = init_logger("PitchCompliance")
-    _file_logger = FileLogger(f'waves_config_{config_num}.log')
+    if len(config_nums) > 1:
+        log_name = f'waves_sweep_{"-".join(map(str, config_nums))}.bin'
+    else:
+        log_name = f'waves_config_{config_num}.bin'
+    binary_logger = BinaryFileLogger(
+        log_name,
+        num_channels=pitch_compliance._ni_device.num_channels,
+        segment_bytes=args.segment_bytes,
+        segment_seconds=args.segment_seconds or None,
+        compression=None if args.compression == "none" else args.compression,
+    )
+    _file_logger = AsyncFileLogger(binary_logger)
+
+    # Every logged sample is also streamed to any connected viewers, batched into
+    # telemetry frames; viewers can connect and leave at any time
+    telemetry = TelemetryEncoder(num_channels=pitch_compliance._ni_device.num_channels)
+    publisher = TelemetryPublisher()
+    publisher.start()
+
+    # Each joint snapshot is held until the DAQ stream has passed its timestamp, so its
+    # channels are interpolated between two real samples. A snapshot the DAQ does not
+    # catch up with in time is logged with NaN channels, as are samples with no DAQ
+    # sample within max_gap of them
+    daq = pitch_compliance._ni_device
+    max_gap = 2 / daq.sample_rate
+    max_hold = 4 * daq.chunk_size / daq.sample_rate
+    held_snapshots = deque()
+
+    def log_snapshots(flush=False):
+        """Log the held snapshots whose DAQ channels can be interpolated, or all of them."""
+        acquired_until = daq.acquired_until()
+        now = clock.now()
+        while held_snapshots:
+            snapshot = held_snapshots[0]
+            if not flush and snapshot.timestamp > acquired_until and now - snapshot.timestamp < max_hold:
+                break
+            held_snapshots.popleft()
+
+            sample_time = clock.to_wall_time(snapshot.timestamp)
+            channels = daq.value_at(snapshot.timestamp, max_gap)
+            _file_logger(sample_time, snapshot.positions, channels)
+
+            frame = telemetry.add(sample_time, snapshot.positions, channels)
+            if frame is not None:
+                publisher.publish(frame)
 
     init_time = time.time()
     running_arm = True
-
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-        sock.bind((socket.gethostname(), 6969))
-        sock.listen()
-        conn, addr = sock.accept()
-
-        # Enable the controller
-        pitch_compliance.enable()
-
-        # Let the controller do its thing
-        while True:
-            try:
-                _file_logger(
-                    time.time(),
-                    pitch_compliance._bravo.joint_positions,
-                    pitch_compliance._ni_device.voltage_reading,
-                )
-
-                if time.time() - init_time > 10 and running_arm:
+    last_sequence = 0
+    executor = None
+
+    # Checked faster than the joints are polled, so that no snapshot is missed
+    loop_scheduler = RateScheduler(200.0)
+
+    # Enable the controller
+    pitch_compliance.enable()
+    loop_scheduler.reset()
+
+    # Let the controller do its thing
+    while True:
+        try:
+            # Each new joint snapshot is logged at its arrival time, with the DAQ channels
+            # interpolated to that same instant
+            snapshot = pitch_compliance._bravo.joint_snapshot()
+            if snapshot.sequence != last_sequence:
+                last_sequence = snapshot.sequence
+                held_snapshots.append(snapshot)
+            log_snapshots()
+
+            if time.time() - init_time > 10 and running_arm:
+                if len(config_nums) > 1:
+                    executor = pitch_compliance.sweep([0] + config_nums)
+                else:
                     pitch_compliance._bravo._run_controller(pitch_compliance.desired_config)
-                    running_arm = False # Reset bool
-                    time.sleep(0.1)
-
-                raw_bytes = struct.pack('d', pitch_compliance._ni_device.voltage_reading[-1])
-                conn.send(raw_bytes)
-                time.sleep(0.1)
-
-            except KeyboardInterrupt:
-                pitch_compliance.disable()
-                exit()
-
+                running_arm = False # Reset bool
+                loop_scheduler.reset()
+
+            loop_scheduler.wait()
+
+        except KeyboardInterrupt:
+            # Stop streaming setpoints before the arm interface goes away
+            if executor is not None:
+                executor.stop()
+                trajectory_file = f"{os.path.splitext(binary_logger.filename)[0]}_trajectory.npz"
+                executor.save(trajectory_file)
+                logger.info(f"Trajectory stats: {executor.stats()}, saved to {trajectory_file}")
+
+            pitch_compliance.disable()
+            log_snapshots(flush=True)
+            publisher.stop()
+            _file_logger.close()
+            logger.info(f"Log writer stats: {_file_logger.stats()}")
+            logger.info(f"Telemetry stats: {publisher.stats()}")
+            exit()
@@ -1,41 +1,97 @@
+import os
+
 import numpy as np
-import kinpy as kp
-from scipy.spatial.transform import Rotation as R
-import matplotlib.pyplot as plt
+
+from clock import interpolate_at
+from kinematics import BatchedFK
+from logger import is_binary_log, log_segments, read_binary_log, read_log_text
+from result_cache import ResultCache, cache_key, hash_file
+from run_catalog import RunCatalog
+from sensor_model import PitchSensorModel
 
 
 class ProcessData():
-    def __init__(self, urdf_fp='urdf/bravo7.urdf') -> None:
-        self.volt_min = -4.262 # volts
-        self.volt_max = -1.48 # volts
-        self.extension_min = 0 # inches
-        self.extension_max = 11.25 # inches
-        self.sensor_mount_height = 27.75 # inches
+    _bracket_table = str.maketrans('', '', '[]')
+
+    # Bump whenever process_config would compute different results from the same inputs,
+    # so that results cached by older code are not reused
+    PROCESSING_VERSION = 2
+
+    def __init__(self, urdf_fp='urdf/bravo7.urdf', cache_dir='.cache/results', sensor=None) -> None:
+        # Voltage to pitch calibration of the linear potentiometer
+        self.sensor = sensor or PitchSensorModel()
 
         # Load predicted pitch values
         self.pred_pitch = self.read_csv()
 
-        # Get the serial chain using the Bravo 7 URDF
-        self.serial_chain = kp.build_serial_chain_from_urdf(open(urdf_fp).read(), "ee_link")
+        # Precompute the Bravo 7 joint transforms from the URDF
+        self.kinematics = BatchedFK(urdf_fp, "ee_link")
 
-    def parse_data_file(self, filename, remove_header=True, num_initial_line_skip=0):
-        data = []
-        with open(filename,'r') as file:
-            for i, line in enumerate(file):
+        # Derived results are cached by the content of the logs, robot model, and predictions
+        self.cache = ResultCache(cache_dir) if cache_dir else None
+        self._model_hashes = [hash_file(urdf_fp), hash_file('data/arm_camera_hardware_pitch_data.csv')]
 
-                # Remove header
-                if remove_header and i == 0:
-                    continue
-                
-                # Skip any additional lines
-                if i <= num_initial_line_skip:
-                    continue
+    def parse_data_file(self, filename, remove_header=True, num_initial_line_skip=0):
+        """Read a log into a 2D array of timestamp, joint position, and voltage columns"""
+        if is_binary_log(filename):
+            return self.parse_binary_file(filename, num_initial_line_skip)
+
+        columns = self.load_data_file(filename, remove_header, num_initial_line_skip)
+        return np.column_stack((columns['timestamp'], columns['joint_position'], columns['linear_potentiometer']))
+
+    def load_data_file(self, filename, remove_header=True, num_initial_line_skip=0, num_joints=7):
+        """Parse a whole text log in one pass into a dict of column arrays
+
+        Rows whose voltage field holds fewer samples than the widest row are padded with NaN.
+        """
+        # Compressed and segmented logs are read as one logical stream
+        lines = read_log_text(filename).splitlines()
+
+        # Matches the original line-by-line reader, which dropped the first line whether
+        # or not remove_header was set, plus every line up to num_initial_line_skip
+        first_line = max(int(remove_header), num_initial_line_skip + 1)
+        lines = [line for line in lines[first_line:] if line]
+
+        num_rows = len(lines)
+        if num_rows == 0:
+            return {
+                'timestamp': np.zeros(0),
+                'joint_position': np.zeros((0, num_joints)),
+                'linear_potentiometer': np.zeros((0, 1)),
+            }
+
+        values = np.fromstring(','.join(lines).translate(self._bracket_table), sep=',')
+        counts = np.array([line.count(',') + 1 for line in lines])
+        if values.size != counts.sum():
+            raise ValueError(f'Could not parse every value in {filename}')
+
+        widths = counts - 1 - num_joints
+        if np.all(widths == widths[0]):
+            # Every row has the same layout, so the values reshape straight into a table
+            table = values.reshape(num_rows, -1)
+            return {
+                'timestamp': table[:, 0],
+                'joint_position': table[:, 1:num_joints + 1],
+                'linear_potentiometer': table[:, num_joints + 1:],
+            }
+
+        starts = np.cumsum(counts) - counts
+        voltage = np.full((num_rows, widths.max()), np.nan)
+        rows = np.repeat(np.arange(num_rows), widths)
+        cols = np.arange(widths.sum()) - np.repeat(np.cumsum(widths) - widths, widths)
+        voltage[rows, cols] = values[np.repeat(starts + num_joints + 1, widths) + cols]
+
+        return {
+            'timestamp': values[starts],
+            'joint_position': values[starts[:, None] + 1 + np.arange(num_joints)],
+            'linear_potentiometer': voltage,
+        }
+
+    def parse_binary_file(self, filename, num_initial_line_skip=0):
+        """Read a binary log into the same column layout as parse_data_file"""
+        records = read_binary_log(filename)[num_initial_line_skip:]
+        return np.column_stack((records['timestamp'], records['joint_position'], records['linear_potentiometer']))
 
-                line_data = line.strip()
-                line_data = list(map(float, line.replace('[', '').replace(']', '').split(',')))
-                data.append(line_data)
-        return data
-    
     def extract_elements(self, data, timestamp_file_column=0, num_joints=7, lin_pot_file_column=8, norm_time=True, clamp_joint_4=True):
         # Convert list to np array
         data_arr = np.array(data)
@@ -56,7 +112,7 @@ class ProcessData():
 
     def volt_to_linear_map(self, voltage_reading, lin_min=0.0, lin_max=11.25, volt_min=-4.262, volt_max=-1.48):
         """Maps voltage readings to a specified range"""
-        return np.interp(voltage_reading, [volt_min, volt_max], [lin_min, lin_max])
+        return PitchSensorModel(volt_min, volt_max, lin_min, lin_max).to_extension(voltage_reading)
     
     def pitch_extrapolation(self, mapped_reading, spring_mount_height=27.75, rad2deg=False):
         """Converting the linear potentiometer readings to pitch angle"""
@@ -89,27 +145,126 @@ class ProcessData():
         joint_pos_trunc = joint_pos[:trunc_idx]
         return trunc_idx, time_trunc, pitch_trunc, joint_pos_trunc
     
-    def exp_stats(self, time, pitch1, pitch2, pitch3):
-        pitch_std = []
-        pitch_avg = []
-        timestamp_trim = []
-        for i in range(min(len(pitch1), len(pitch2), len(pitch3))):
-            pitch_std.append(np.std([pitch1[i], pitch2[i], pitch3[i]]))
-            pitch_avg.append(np.average([pitch1[i], pitch2[i], pitch3[i]]))
-            timestamp_trim.append(time[i])
-        return pitch_avg, pitch_std, timestamp_trim
-
-    def fk_from_urdf(self, joint_positions):
-        # Get the end-effector poses in the base frame as a numpy array
-        xe_rot = []
-        xe = []
-        for i in range(len(joint_positions)):
-            xe_transform = self.serial_chain.forward_kinematics(joint_positions[i][::-1])
-            x_to_array = [*xe_transform.pos]
-            xe.append(x_to_array)
-        return np.array(xe)
+    def exp_stats(self, time, *pitches):
+        """Average and spread of any number of trials, aligned to the shortest one"""
+        pitch_stats = self.trial_stats(pitches)
+        return pitch_stats['mean'], pitch_stats['std'], time[:pitch_stats['n_samples']]
+
+    def trial_stats(self, pitches, times=None, time_base=None, confidence=0.95):
+        """Compute per-sample statistics across repeated trials in one vectorized pass
+
+        Args:
+            pitches: A sequence of 1D pitch series, one per trial.
+            times: The timestamps of each series; required with time_base.
+            time_base: A common time grid to interpolate every trial onto. Without it the
+                trials are aligned by index and cut to the shortest one.
+            confidence: The confidence level of the band around the mean.
+
+        Returns:
+            A dict with the per-sample mean, std, min, max, ci_low and ci_high, plus
+            n_trials and n_samples.
+        """
+        if time_base is None:
+            n_samples = min(len(pitch) for pitch in pitches)
+            trials = np.stack([np.asarray(pitch[:n_samples], dtype=float) for pitch in pitches])
+        else:
+            n_samples = len(time_base)
+            trials = np.stack([np.interp(time_base, t, pitch) for t, pitch in zip(times, pitches)])
+
+        n_trials = len(trials)
+        mean = trials.mean(axis=0)
+
+        # Student-t band on the mean; undefined for a single trial
+        if n_trials > 1:
+            from scipy import stats
+
+            sem = trials.std(axis=0, ddof=1) / np.sqrt(n_trials)
+            half_width = stats.t.ppf(0.5 + confidence / 2, n_trials - 1) * sem
+        else:
+            half_width = np.full(n_samples, np.nan)
+
+        return {
+            'mean': mean,
+            'std': trials.std(axis=0),
+            'min': trials.min(axis=0),
+            'max': trials.max(axis=0),
+            'ci_low': mean - half_width,
+            'ci_high': mean + half_width,
+            'n_trials': n_trials,
+            'n_samples': n_samples,
+        }
+
+    def resample(self, time_base, time, values):
+        """Linearly interpolate samples (1D or one row per sample) onto a new time grid"""
+        return interpolate_at(time_base, time, values)
+
+    def detect_motion_start(self, time, joint_positions, threshold=0.01, baseline_samples=10):
+        """Find the index of the first sample where the arm has left its starting configuration
+
+        Rows logged before any joint packet arrived (all zeros) are ignored, and the starting
+        configuration is the median of the next baseline_samples rows.
+        """
+        joint_positions = np.asarray(joint_positions)
+        valid = np.flatnonzero(np.any(joint_positions != 0, axis=1))
+        if len(valid) <= baseline_samples:
+            return 0
+
+        search_from = valid[baseline_samples]
+        baseline = np.median(joint_positions[valid[:baseline_samples]], axis=0)
+        deviation = np.abs(joint_positions[search_from:] - baseline).max(axis=1)
+
+        moved = np.flatnonzero(deviation > threshold)
+        return search_from + moved[0] if len(moved) else 0
+
+    def motion_aligned_time(self, time, joint_positions, pre_roll=10.0, threshold=0.01):
+        """Shift a trial's timestamps so that its motion starts pre_roll seconds in"""
+        start_idx = self.detect_motion_start(time, joint_positions, threshold)
+        return time - time[start_idx] + pre_roll
+
+    def align_trials(self, times, joint_positions, *signals, dt=None, pre_roll=10.0, end_time=None, threshold=0.01):
+        """Resample trials onto one uniform time grid anchored at each trial's motion start
+
+        Args:
+            times: The timestamps of each trial.
+            joint_positions: The joint positions of each trial, used to detect motion start.
+            signals: Any further per-trial series (e.g. pitch) to resample alongside.
+            dt: The grid spacing (s); defaults to the coarsest trial's median spacing.
+            pre_roll: Where the motion start lands on the grid (s).
+            end_time: Optionally cut the grid at this time (s).
+            threshold: The joint deviation (rad) that counts as motion.
+
+        Returns:
+            The time grid, the resampled joint positions stacked as (trials, samples, joints),
+            and each signal stacked as (trials, samples).
+        """
+        shifted = [self.motion_aligned_time(t, q, pre_roll, threshold) for t, q in zip(times, joint_positions)]
+
+        if dt is None:
+            dt = max(np.median(np.diff(t)) for t in shifted)
+
+        # Only the span covered by every trial is kept, so nothing is extrapolated
+        start = max(t[0] for t in shifted)
+        stop = min(t[-1] for t in shifted)
+        if end_time is not None:
+            stop = min(stop, end_time)
+        time_base = start + dt * np.arange(int(np.floor((stop - start) / dt)) + 1)
+
+        aligned = [np.stack([self.resample(time_base, t, q) for t, q in zip(shifted, joint_positions)])]
+        for signal in signals:
+            aligned.append(np.stack([self.resample(time_base, t, x) for t, x in zip(shifted, signal)]))
+
+        return (time_base, *aligned)
+
+    def fk_from_urdf(self, joint_positions, rotations=False, quaternions=False):
+        """Get the end-effector poses in the base frame for every row of logged joint positions
+
+        The logged joints run from the jaws to the base, so they are reversed into chain order.
+        """
+        return self.kinematics.forward_kinematics(np.asarray(joint_positions)[:, ::-1], rotations, quaternions)
 
     def plot_data(self, x, y, title='', ylabel='', xlabel='', legend=[]):
+        import matplotlib.pyplot as plt
+
         plt.plot(x, y)
         plt.xlabel(xlabel)
         plt.ylabel(ylabel)
@@ -121,152 +276,163 @@ class ProcessData():
     def plot_single_exp(self, config_num, filename="logs/hinsdale_out_of_plane_config_2.log", del_init=True, initial_trim=3):
         pass
 
-    def plot_all_exp(self, config_num, file_text_name='logs/hinsdale_config', redo_1=False, redo_2=False, redo_3=False, truncate=True, del_init=True, initial_trim=3, waves=False, plot=True):
-        if redo_1:
-            data1 = self.parse_data_file(f'{file_text_name}_{config_num}_redo.log')
-        else:
-            data1 = self.parse_data_file(f'{file_text_name}_{config_num}.log')
-        
-        if redo_2:
-            data2 = self.parse_data_file(f'{file_text_name}_{config_num}_2_redo.log')
-        else:
-            data2 = self.parse_data_file(f'{file_text_name}_{config_num}_2.log')
-
-        if redo_3:          
-            data3 = self.parse_data_file(f'{file_text_name}_{config_num}_3_redo.log')
-        else:
-            data3 = self.parse_data_file(f'{file_text_name}_{config_num}_3.log')
+    def trial_files(self, config_num, file_text_name='logs/hinsdale_config', redos=(False, False, False)):
+        """Find the log of each trial of a configuration through the run catalogue.
+
+        A redo flag of True or False asks for the redo or the original run of that trial,
+        and None picks the redo if one was recorded.
+        """
+        log_dir = os.path.dirname(file_text_name) or '.'
+        experiment = os.path.basename(file_text_name).removesuffix('_config')
+
+        catalog = RunCatalog(log_dir)
+        catalog.update()
+
+        files = []
+        for trial, redo in enumerate(redos, start=1):
+            runs = catalog.query(experiment=experiment, config=config_num, trial=trial, redo=redo)
+            if not runs:
+                raise FileNotFoundError(f'No {experiment} log of config {config_num}, trial {trial} in {log_dir}')
+            files.append(catalog.path(runs[-1]))
+        return files
+
+    def process_config(self, config_num, file_text_name='logs/hinsdale_config', redos=(False, False, False), truncate=True, del_init=True, initial_trim=3, waves=False, use_cache=True):
+        """Parse, convert, and align every trial of a configuration
+
+        Results are cached on disk by the content of the logs and the processing
+        parameters, and cached arrays are returned memory-mapped.
+
+        Returns:
+            A dict of the aligned time grid, joint positions, and pitch of every trial, the
+            end-effector path of the first trial, the pitch statistics, the predicted pitch,
+            and, with waves, the time and pitch of the wave run.
+        """
+        files = self.trial_files(config_num, file_text_name, redos)
+        wave_file = os.path.join(os.path.dirname(file_text_name), f'video_config_{config_num}.log') if waves else None
+
+        if not (use_cache and self.cache):
+            return self._process_config(config_num, files, wave_file, truncate, del_init, initial_trim)
+
+        params = {
+            'version': self.PROCESSING_VERSION,
+            'models': self._model_hashes,
+            'config_num': config_num,
+            'sensor': self.sensor.params(),
+            'truncate': truncate,
+            'del_init': del_init,
+            'initial_trim': initial_trim,
+        }
+        # A segmented log is hashed by its segments, since its manifest can stay the same
+        # when a segment is rewritten
+        inputs = files + ([wave_file] if wave_file else [])
+        key = cache_key([segment for filename in inputs for segment in log_segments(filename)], params)
+
+        results = self.cache.get(key)
+        if results is None:
+            results = self._process_config(config_num, files, wave_file, truncate, del_init, initial_trim)
+            self.cache.put(key, results)
+
+        # The cache only depends on file content, so report where it was read from this time
+        results['files'] = files
+        return results
+
+    def _process_config(self, config_num, files, wave_file, truncate, del_init, initial_trim):
+        data1, data2, data3 = (self.parse_data_file(f) for f in files)
 
         timestamp1, joint_positions1, volt_reading1 = self.extract_elements(data1)
         timestamp2, joint_positions2, volt_reading2 = self.extract_elements(data2)
-        timestamp3, joint_positions3, volt_reading3 = self.extract_elements(data3)    
+        timestamp3, joint_positions3, volt_reading3 = self.extract_elements(data3)
 
-        mapped_reading1 = self.volt_to_linear_map(volt_reading1)    
-        mapped_reading2 = self.volt_to_linear_map(volt_reading2)
-        mapped_reading3 = self.volt_to_linear_map(volt_reading3)
-
-        pitch1 = self.pitch_extrapolation(mapped_reading1, rad2deg=True)
-        pitch2 = self.pitch_extrapolation(mapped_reading2, rad2deg=True)
-        pitch3 = self.pitch_extrapolation(mapped_reading3, rad2deg=True)
+        # The voltage columns are fresh copies, so they are converted in place
+        pitch1 = self.sensor.to_pitch(volt_reading1, out=volt_reading1)
+        pitch2 = self.sensor.to_pitch(volt_reading2, out=volt_reading2)
+        pitch3 = self.sensor.to_pitch(volt_reading3, out=volt_reading3)
 
         xe = self.fk_from_urdf(joint_positions1)
         xe = np.delete(xe, range(initial_trim), 0)
 
-        if waves:
-            data_waves = self.parse_data_file(f'logs/video_config_{config_num}.log')
+        results = {'config_num': config_num, 'files': files}
+
+        if wave_file:
+            data_waves = self.parse_data_file(wave_file)
             time_waves, joint_pos_waves, volt_waves = self.extract_elements(data_waves)
-            map_reading_waves = self.volt_to_linear_map(volt_waves)
-            pitch_waves = self.pitch_extrapolation(map_reading_waves, rad2deg=True)
+            pitch_waves = self.sensor.to_pitch(volt_waves, out=volt_waves)
 
             if del_init:
                 time_waves, pitch_waves, joint_pos_waves = self.del_initial(time_waves, pitch_waves, joint_pos_waves, num_to_del=initial_trim)
 
+            time_waves = self.motion_aligned_time(time_waves, joint_pos_waves)
             if truncate:
-                _, time_waves, pitch_waves, joint_pos_waves = self.truncate(time_waves, pitch_waves, joint_pos_waves)
+                in_window = time_waves < 15
+                time_waves, pitch_waves = time_waves[in_window], pitch_waves[in_window]
+
+            results['time_waves'] = time_waves
+            results['pitch_waves'] = pitch_waves
 
         if del_init:
             timestamp1, pitch1, joint_positions1 = self.del_initial(timestamp1, pitch1, joint_positions1, num_to_del=initial_trim)
             timestamp2, pitch2, joint_positions2 = self.del_initial(timestamp2, pitch2, joint_positions2, num_to_del=initial_trim)
             timestamp3, pitch3, joint_positions3 = self.del_initial(timestamp3, pitch3, joint_positions3, num_to_del=initial_trim)
 
-        if config_num == 2 or config_num == 4 or config_num == 6 or config_num == 7 or config_num == 9:
-            range_val = 554
-            if config_num == 2:
-                init_val = 10.0573
-            elif config_num == 4:
-                init_val = 9.85
-            elif config_num == 6:
-                init_val = 10.549
-            elif config_num == 7:
-                init_val = 10.423
-                range_val = 553
-            elif config_num == 9:
-                init_val = 10.423
-                range_val = 477
-
-            pitch1_new = pitch1
-            for i in range(range_val):
-                pitch1_new = np.insert(pitch1_new, 0, init_val)
-        else:
-            pitch1_new = pitch1
-
-        if truncate:
-            _, timestamp1, pitch1, joint_positions1 = self.truncate(timestamp1, pitch1, joint_positions1)
-            trunc_idx_2, timestamp2, pitch2, joint_positions2 = self.truncate(timestamp2, pitch2, joint_positions2)
-            _, timestamp3, pitch3, joint_positions3 = self.truncate(timestamp3, pitch3, joint_positions3)
-
-            pitch1_new = pitch1_new[:trunc_idx_2]
-
-        pitch_avg, pitch_std, timestamp_trim = self.exp_stats(timestamp2, pitch1_new, pitch2, pitch3)
-
-        if plot:
-            # Plot data
-            plt.figure() # initialize figure
-            plt.suptitle(f"Configuration #{config_num}", fontsize=14)
-
-            # First subplot
-            if waves:
-                plt.subplot(141)
-            else:
-                plt.subplot(131) 
-            plt.plot(timestamp1, joint_positions1[:, 2], color='purple')
-            plt.plot(timestamp1, joint_positions1[:, 4], color='red')
-            plt.plot(timestamp1, joint_positions1[:, 5], color='black')
-            plt.xlabel('Time (s)')
-            plt.ylabel('Position (rad)')
-            plt.title('Bravo Trajectory')
-            plt.legend(['joint 1', 'joint 2', 'joint 3'])
-            plt.grid(color='black', linestyle='-', linewidth=0.1)
-
-            # Second subplot
-            if waves:
-                plt.subplot(142) 
-            else:
-                plt.subplot(132)
-            plt.plot(xe[:, 0], xe[:, 2])
-            plt.xlabel('x (m)')
-            plt.ylabel('y (m)')
-            plt.title('End-Effector Position')
-            plt.legend(['bravo traj'])
-            plt.grid(color='black', linestyle='-', linewidth=0.1)
-
-            # plt.plot(timestamp1, pitch1)
-            # plt.plot(timestamp2, pitch2)
-            # plt.plot(timestamp3, pitch3)
-            # plt.xlabel('Time (s)')
-            # plt.ylabel('Pitch (deg)')
-            # plt.title('Frame Pitch over Bravo Trajectory')
-            # plt.legend(['Exp. 1', 'Exp. 2', 'Exp. 3'])
-            # plt.grid(color='black', linestyle='-', linewidth=0.1)
-
-            # Third subplot
-            if waves:
-                plt.subplot(143) 
-            else:
-                plt.subplot(133)
-            plt.plot(timestamp_trim, pitch_avg, color='black')
-            plt.fill_between(timestamp_trim, np.subtract(pitch_avg, pitch_std), np.add(pitch_avg, pitch_std), color='black', alpha=0.4)
-            plt.plot(timestamp_trim, [np.rad2deg(self.pred_pitch[config_num])] * len(timestamp_trim), '--')
-            plt.xlabel('Time (s)')
-            plt.ylabel('Pitch (deg)')
-            plt.title('Average Frame Pitch')
-            plt.legend(['Avg', 'Std', f'Pred: {round(np.rad2deg(self.pred_pitch[config_num]), 1)}'])
-            plt.grid(color='black', linestyle='-', linewidth=0.1)
-
-            if waves:
-                plt.subplot(144) 
-                plt.plot(timestamp_trim, pitch_avg, color='black')
-                plt.fill_between(timestamp_trim, np.subtract(pitch_avg, pitch_std), np.add(pitch_avg, pitch_std), color='black', alpha=0.4)
-                plt.plot(timestamp_trim, [np.rad2deg(self.pred_pitch[config_num])] * len(timestamp_trim), '--')
-                plt.plot(time_waves, pitch_waves)
-                plt.xlabel('Time (s)')
-                plt.ylabel('Pitch (deg)')
-                plt.title('Pitch Comparision - Waves')
-                plt.legend(['Avg', 'Std', f'Pred: {round(np.rad2deg(self.pred_pitch[config_num]), 1)}'], 'Waves')
-                plt.grid(color='black', linestyle='-', linewidth=0.1)
-
+        # Put every trial on a common time grid with the arm motion starting at 10 s
+        timestamp_trim, aligned_joints, aligned_pitch = self.align_trials(
+            [timestamp1, timestamp2, timestamp3],
+            [joint_positions1, joint_positions2, joint_positions3],
+            [pitch1, pitch2, pitch3],
+            end_time=15 if truncate else None,
+        )
+
+        results.update(
+            time=timestamp_trim,
+            joint_positions=aligned_joints,
+            pitch=aligned_pitch,
+            ee_position=xe,
+            pitch_stats=self.trial_stats(aligned_pitch),
+            pred_pitch=np.rad2deg(self.pred_pitch[config_num]),
+        )
+        return results
+
+    def plot_config(self, results, fig=None):
+        """Draw the trajectory, end-effector path, and pitch panels of a processed configuration
+
+        Args:
+            results: The output of process_config.
+            fig: The figure to draw into; a new pyplot figure is created by default.
+
+        Returns:
+            The figure.
+        """
+        from config_figures import ConfigFigureRenderer
+
+        if fig is None:
+            import matplotlib.pyplot as plt
+
+            fig = plt.figure()
+
+        return ConfigFigureRenderer('pitch_waves' in results, fig).render(results)
+
+    def plot_all_exp(self, config_num, file_text_name='logs/hinsdale_config', redo_1=False, redo_2=False, redo_3=False, truncate=True, del_init=True, initial_trim=3, waves=False, plot=True, save_as=None, formats=('png',)):
+        """Process a configuration and show its figure
+
+        With save_as, the figure is instead rendered headless and written to save_as with
+        each of the given extensions, e.g. ('png', 'svg', 'pdf').
+        """
+        results = self.process_config(config_num, file_text_name, (redo_1, redo_2, redo_3), truncate, del_init, initial_trim, waves)
+
+        if save_as is not None:
+            from config_figures import ConfigFigureRenderer
+
+            renderer = ConfigFigureRenderer(waves)
+            renderer.render(results)
+            renderer.save(save_as, formats)
+        elif plot:
+            import matplotlib.pyplot as plt
+
+            self.plot_config(results)
             plt.show()
 
+        return results
+
 
 if __name__ == '__main__':    
     pdata = ProcessData()
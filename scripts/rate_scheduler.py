@@ -0,0 +1,81 @@
+import time
+
+import numpy as np
+
+from ring_buffer import RingBuffer
+
+
+class RateScheduler:
+    """Paces a loop at a fixed rate using absolute deadlines.
+
+    Deadlines advance by exactly one period per tick, so the time spent in the loop body
+    and oversleeping do not accumulate into drift. If the loop falls more than a period
+    behind, the missed ticks are dropped rather than sent back to back.
+    """
+
+    def __init__(self, rate: float, stats_window: int = 1000, clock=time.monotonic, sleep=time.sleep) -> None:
+        """Create a new scheduler.
+
+        Args:
+            rate: The target loop rate (Hz).
+            stats_window: The number of recent ticks used for the rate and jitter stats.
+            clock: The monotonic clock to schedule against (s).
+            sleep: The function used to wait.
+        """
+        self.rate = rate
+        self.period = 1.0 / rate
+        self._clock = clock
+        self._sleep = sleep
+
+        # Tick times, with how late each tick was relative to its deadline
+        self._ticks = RingBuffer(stats_window)
+        self._tick_time = np.zeros(1)
+        self._lateness = np.zeros((1, 1))
+
+        self.overruns = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Restart the schedule from the current time."""
+        self._deadline = self._clock()
+
+    def wait(self) -> float:
+        """Sleep until the next deadline.
+
+        Returns:
+            How late (s) the loop woke up relative to the deadline.
+        """
+        self._deadline += self.period
+
+        delay = self._deadline - self._clock()
+        if delay > 0:
+            self._sleep(delay)
+        elif -delay > self.period:
+            self.overruns += 1
+            self._deadline = self._clock()
+
+        self._tick_time[0] = self._clock()
+        self._lateness[0, 0] = self._tick_time[0] - self._deadline
+        self._ticks.extend(self._tick_time, self._lateness)
+
+        return self._lateness[0, 0]
+
+    def stats(self) -> dict:
+        """Get the achieved rate (Hz) and the period jitter and lateness (s) of recent ticks."""
+        ticks, lateness = self._ticks.last(len(self._ticks))
+        periods = np.diff(ticks)
+
+        if len(periods) == 0:
+            achieved_rate = jitter = float("nan")
+        else:
+            achieved_rate = 1.0 / periods.mean()
+            jitter = periods.std()
+
+        return {
+            "target_rate": self.rate,
+            "achieved_rate": achieved_rate,
+            "jitter": jitter,
+            "mean_lateness": lateness[0].mean() if len(ticks) else float("nan"),
+            "max_lateness": lateness[0].max() if len(ticks) else float("nan"),
+            "overruns": self.overruns,
+        }
@@ -0,0 +1,126 @@
+"""On-disk cache of derived results keyed by the content of their inputs.
+
+An entry's key is a hash of the raw input files together with the processing parameters,
+so editing a log or changing a parameter simply produces a different key and stale
+entries are never read. Each entry is a directory of .npy files, which are loaded
+memory-mapped, plus a meta.json holding the values that are not arrays.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+# Hashes of unchanged files are reused, keyed by (path, size, mtime_ns)
+_file_hashes: dict[tuple[str, int, int], str] = {}
+
+
+def hash_file(filename: str, chunk_size: int = 1 << 20) -> str:
+    """Get the BLAKE2 hash of a file's content."""
+    stat = os.stat(filename)
+    memo_key = (os.path.abspath(filename), stat.st_size, stat.st_mtime_ns)
+    if memo_key in _file_hashes:
+        return _file_hashes[memo_key]
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filename, "rb") as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+
+    _file_hashes[memo_key] = digest.hexdigest()
+    return _file_hashes[memo_key]
+
+
+def cache_key(files: list[str], params: dict) -> str:
+    """Get the cache key of results derived from some files with some parameters.
+
+    Args:
+        files: The input files; only their content matters, not their names.
+        params: The processing parameters; they must be JSON-serializable.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for filename in files:
+        digest.update(hash_file(filename).encode())
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def _flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for name, value in results.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{name}."))
+        else:
+            flat[f"{prefix}{name}"] = value
+    return flat
+
+
+def _unflatten(flat: dict) -> dict:
+    results = {}
+    for name, value in flat.items():
+        *parents, leaf = name.split(".")
+        node = results
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[leaf] = value
+    return results
+
+
+class ResultCache:
+    """Directory of cached results, one subdirectory per key."""
+
+    def __init__(self, cache_dir: str = ".cache/results") -> None:
+        self.cache_dir = cache_dir
+
+    def get(self, key: str, mmap: bool = True) -> dict | None:
+        """Load an entry, or get None if it is not cached.
+
+        Args:
+            key: The entry's key, from cache_key().
+            mmap: Memory-map the arrays instead of reading them in.
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        if not os.path.isdir(entry_dir):
+            return None
+
+        with open(os.path.join(entry_dir, "meta.json"), "r") as file:
+            meta = json.load(file)
+
+        flat = meta["values"]
+        for name in meta["arrays"]:
+            flat[name] = np.load(os.path.join(entry_dir, f"{name}.npy"), mmap_mode="r" if mmap else None)
+        return _unflatten(flat)
+
+    def put(self, key: str, results: dict) -> None:
+        """Store an entry.
+
+        Arrays, including those in nested dicts, are saved as .npy files and every other
+        value must be JSON-serializable.
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        tmp_dir = f"{entry_dir}.tmp{os.getpid()}"
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        arrays, values = [], {}
+        for name, value in _flatten(results).items():
+            if isinstance(value, np.ndarray):
+                np.save(os.path.join(tmp_dir, f"{name}.npy"), value)
+                arrays.append(name)
+            else:
+                values[name] = value.item() if isinstance(value, np.generic) else value
+
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as file:
+            json.dump({"arrays": arrays, "values": values}, file)
+
+        # Complete entries appear atomically; if another process got there first, its
+        # entry is identical and is kept
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
@@ -0,0 +1,111 @@
+import threading
+
+import numpy as np
+
+
+class RingBuffer:
+    """Preallocated circular buffer of timestamped multi-channel samples."""
+
+    def __init__(self, capacity: int, num_channels: int = 1, dtype=np.float64) -> None:
+        """Create a new ring buffer.
+
+        Args:
+            capacity: The maximum number of samples kept per channel.
+            num_channels: The number of channels stored side by side.
+            dtype: The data type of the stored samples.
+        """
+        self.capacity = capacity
+        self.num_channels = num_channels
+
+        self._data = np.zeros((num_channels, capacity), dtype=dtype)
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+
+        # Total number of samples ever written; the write head is this modulo capacity
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def total_written(self) -> int:
+        """The number of samples written since the buffer was created."""
+        return self._count
+
+    def extend(self, timestamps: np.ndarray, samples: np.ndarray) -> None:
+        """Append a chunk of samples.
+
+        Args:
+            timestamps: The sample times, shape (n,).
+            samples: The sample values, shape (num_channels, n).
+        """
+        n = len(timestamps)
+        if n == 0:
+            return
+
+        # Only the newest samples can survive a chunk larger than the buffer
+        skipped = max(n - self.capacity, 0)
+        if skipped:
+            timestamps = timestamps[skipped:]
+            samples = samples[:, skipped:]
+            n = self.capacity
+
+        with self._lock:
+            start = (self._count + skipped) % self.capacity
+            first = min(n, self.capacity - start)
+
+            self._timestamps[start:start + first] = timestamps[:first]
+            self._data[:, start:start + first] = samples[:, :first]
+
+            if first < n:
+                self._timestamps[:n - first] = timestamps[first:]
+                self._data[:, :n - first] = samples[:, first:]
+
+            self._count += skipped + n
+
+    def latest(self) -> tuple[float, np.ndarray] | None:
+        """Get the most recent sample.
+
+        Returns:
+            The timestamp and a copy of the per-channel values, or None if the buffer is
+            empty.
+        """
+        with self._lock:
+            if self._count == 0:
+                return None
+
+            idx = (self._count - 1) % self.capacity
+            return float(self._timestamps[idx]), self._data[:, idx].copy()
+
+    def last(self, n: int) -> tuple[np.ndarray, np.ndarray]:
+        """Get copies of the newest n samples in chronological order.
+
+        Returns:
+            The timestamps, shape (n,), and the values, shape (num_channels, n).
+        """
+        with self._lock:
+            return self._last(n)
+
+    def since(self, t: float) -> tuple[np.ndarray, np.ndarray]:
+        """Get copies of all buffered samples with a timestamp later than t.
+
+        Returns:
+            The timestamps, shape (n,), and the values, shape (num_channels, n).
+        """
+        with self._lock:
+            head = self._count % self.capacity
+            newer = self._timestamps[:head]
+            n = len(newer) - np.searchsorted(newer, t, side="right")
+
+            # The wrapped, older segment only matters if everything newer qualified
+            if n == len(newer) and self._count > head:
+                older = self._timestamps[head:]
+                n += len(older) - np.searchsorted(older, t, side="right")
+
+            return self._last(n)
+
+    def _last(self, n: int) -> tuple[np.ndarray, np.ndarray]:
+        n = min(n, len(self))
+        end = self._count % self.capacity
+        idx = np.arange(end - n, end) % self.capacity
+        return self._timestamps[idx], self._data[:, idx]
@@ -0,0 +1,216 @@
+"""Index of the experiment runs in a log directory.
+
+Run metadata is parsed from the log filenames and from the cheap parts of each file
+(binary headers and sizes, or the first and last lines of text logs) and kept in a JSON
+catalogue next to the logs. Rebuilding only rescans files whose size or modification
+time changed.
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+
+from logger import (
+    BINARY_LOG_HEADER_SIZE,
+    MANIFEST_EXTENSION,
+    _parse_binary_log_header,
+    is_binary_log,
+    log_segments,
+    open_log_file,
+)
+
+# e.g. "hinsdale_config_3_2_redo.log": experiment, config number, trial, redo
+RUN_NAME = re.compile(
+    r"^(?P<experiment>.+?)_config_(?P<config>\d+)(?:_(?P<trial>\d+))?(?P<redo>_redo)?\."
+)
+
+# Segments are indexed through their manifest rather than on their own
+SEGMENT_NAME = re.compile(r"\.\d{3}\.(log|bin)(\.gz|\.zst)?$")
+
+LOG_EXTENSIONS = (".log", ".bin", ".log.gz", ".bin.gz", ".log.zst", ".bin.zst", MANIFEST_EXTENSION)
+
+
+def _text_time_range(filename: str, chunk_size: int = 1 << 20) -> tuple[int, float | None, float | None]:
+    """Count the records of a text log and read the first and last timestamps.
+
+    Records are counted by newlines in fixed-size chunks, so only the first and last
+    lines are ever split and parsed.
+    """
+    first = last = None
+    num_records = 0
+
+    for segment in log_segments(filename):
+        with open_log_file(segment, "rb") as file:
+            file.readline()
+            tail = file.readline()
+            if not tail.strip():
+                continue
+            first_line = tail
+
+            count = tail.count(b"\n")
+            while chunk := file.read(chunk_size):
+                count += chunk.count(b"\n")
+                tail = tail[-chunk_size:] + chunk
+
+        # The last record may or may not be newline-terminated
+        num_records += count + int(not tail.endswith(b"\n"))
+        tail = tail.rstrip(b"\r\n")
+        last_line = tail.rsplit(b"\n", 1)[-1]
+
+        if first is None:
+            first = float(first_line.split(b",", 1)[0])
+        last = float(last_line.split(b",", 1)[0])
+
+    return num_records, first, last
+
+
+def _binary_time_range(filename: str) -> tuple[int, float | None, float | None]:
+    """Count the records of a binary log and read the first and last timestamps.
+
+    Uncompressed segments only have their header and two records read.
+    """
+    first = last = None
+    num_records = 0
+
+    for segment in log_segments(filename):
+        with open_log_file(segment, "rb") as file:
+            header = file.read(BINARY_LOG_HEADER_SIZE)
+            dtype = _parse_binary_log_header(header, segment)
+
+            if segment.endswith(".bin"):
+                count = (os.path.getsize(segment) - BINARY_LOG_HEADER_SIZE) // dtype.itemsize
+                if count == 0:
+                    continue
+                head = np.frombuffer(file.read(dtype.itemsize), dtype=dtype)
+                file.seek(BINARY_LOG_HEADER_SIZE + (count - 1) * dtype.itemsize)
+                tail = np.frombuffer(file.read(dtype.itemsize), dtype=dtype)
+            else:
+                # Compressed streams cannot seek cheaply, so they are read through
+                data = file.read()
+                count = len(data) // dtype.itemsize
+                if count == 0:
+                    continue
+                records = np.frombuffer(data, dtype=dtype, count=count)
+                head, tail = records[:1], records[-1:]
+
+        num_records += count
+        if first is None:
+            first = float(head["timestamp"][0])
+        last = float(tail["timestamp"][0])
+
+    return num_records, first, last
+
+
+def describe_run(filename: str) -> dict:
+    """Collect the catalogue entry of one log file or manifest."""
+    name = os.path.basename(filename)
+    match = RUN_NAME.match(name)
+
+    if is_binary_log(filename):
+        num_samples, start_time, end_time = _binary_time_range(filename)
+    else:
+        num_samples, start_time, end_time = _text_time_range(filename)
+
+    stat = os.stat(filename)
+    return {
+        "file": name,
+        "experiment": match["experiment"] if match else None,
+        "config": int(match["config"]) if match else None,
+        "trial": int(match["trial"] or 1) if match else None,
+        "redo": bool(match and match["redo"]),
+        "num_samples": num_samples,
+        "start_time": start_time,
+        "end_time": end_time,
+        "duration": end_time - start_time if num_samples else 0.0,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+class RunCatalog:
+    """Incrementally built index of the runs in a log directory."""
+
+    def __init__(self, log_dir: str = "logs", catalog_file: str | None = None) -> None:
+        """Load the catalogue, if one exists.
+
+        Args:
+            log_dir: The directory holding the logs.
+            catalog_file: Where the catalogue is stored; defaults to catalog.json in
+                log_dir.
+        """
+        self.log_dir = log_dir
+        self.catalog_file = catalog_file or os.path.join(log_dir, "catalog.json")
+
+        self.runs: dict[str, dict] = {}
+        if os.path.isfile(self.catalog_file):
+            with open(self.catalog_file, "r") as file:
+                self.runs = {run["file"]: run for run in json.load(file)["runs"]}
+
+    def update(self, save: bool = True) -> int:
+        """Index new and changed logs and forget deleted ones.
+
+        Returns:
+            The number of logs that were (re)scanned.
+        """
+        present = set()
+        scanned = 0
+
+        for name in sorted(os.listdir(self.log_dir)):
+            if not name.endswith(LOG_EXTENSIONS) or SEGMENT_NAME.search(name):
+                continue
+
+            present.add(name)
+            path = os.path.join(self.log_dir, name)
+            stat = os.stat(path)
+
+            run = self.runs.get(name)
+            if run is not None and run["size"] == stat.st_size and run["mtime_ns"] == stat.st_mtime_ns:
+                continue
+
+            self.runs[name] = describe_run(path)
+            scanned += 1
+
+        for name in set(self.runs) - present:
+            del self.runs[name]
+
+        if save and (scanned or len(present) != len(self.runs)):
+            self.save()
+        return scanned
+
+    def save(self) -> None:
+        """Write the catalogue atomically."""
+        tmp_path = f"{self.catalog_file}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump({"runs": sorted(self.runs.values(), key=lambda run: run["file"])}, file, indent=2)
+        os.replace(tmp_path, self.catalog_file)
+
+    def query(self, experiment=None, config=None, trial=None, redo=None) -> list[dict]:
+        """Get the runs matching every given field, ordered by config, trial, and redo."""
+        criteria = {"experiment": experiment, "config": config, "trial": trial, "redo": redo}
+        runs = [
+            run
+            for run in self.runs.values()
+            if all(value is None or run[field] == value for field, value in criteria.items())
+        ]
+        return sorted(runs, key=lambda run: (run["config"] is None, run["config"] or 0, run["trial"] or 0, run["redo"]))
+
+    def trials(self, config: int, experiment: str = "hinsdale", latest_redo: bool = True) -> list[dict]:
+        """Get one run per trial of a configuration.
+
+        Args:
+            config: The configuration number.
+            experiment: The experiment type, e.g. "hinsdale" or "video".
+            latest_redo: Prefer a trial's redo over its original run.
+        """
+        chosen = {}
+        for run in self.query(experiment=experiment, config=config):
+            # Runs are ordered with redos last, so later runs replace earlier ones
+            if run["trial"] not in chosen or (latest_redo and run["redo"]):
+                chosen[run["trial"]] = run
+        return [chosen[trial] for trial in sorted(chosen)]
+
+    def path(self, run: dict) -> str:
+        """Get the path of a catalogued run."""
+        return os.path.join(self.log_dir, run["file"])
@@ -0,0 +1,131 @@
+"""Calibrated model of the linear potentiometer that measures the frame pitch.
+
+The potentiometer's voltage maps to the extension of the spring it is mounted on, and the
+extension over the mount height is the pitch as an arc length. With the linear calibration,
+the whole chain collapses to one clamped affine map that is precomputed once.
+"""
+
+import math
+
+import numpy as np
+
+VOLT_MIN = -4.262  # volts
+VOLT_MAX = -1.48  # volts
+EXTENSION_MIN = 0.0  # inches
+EXTENSION_MAX = 11.25  # inches
+SENSOR_MOUNT_HEIGHT = 27.75  # inches
+
+
+class PitchSensorModel:
+    """Converts potentiometer voltages to extension and pitch."""
+
+    def __init__(
+        self,
+        volt_min: float = VOLT_MIN,
+        volt_max: float = VOLT_MAX,
+        extension_min: float = EXTENSION_MIN,
+        extension_max: float = EXTENSION_MAX,
+        mount_height: float = SENSOR_MOUNT_HEIGHT,
+        table=None,
+    ) -> None:
+        """Create a new sensor model.
+
+        Args:
+            volt_min: The voltage at the minimum extension (V).
+            volt_max: The voltage at the maximum extension (V).
+            extension_min: The minimum extension (in).
+            extension_max: The maximum extension (in).
+            mount_height: The height of the sensor mount (in).
+            table: Optional (voltages, extensions) calibration points of a recalibrated
+                sensor, which replace the linear two-point calibration. Voltages outside
+                the table are clamped to its ends.
+        """
+        self.mount_height = mount_height
+
+        if table is None:
+            voltages = np.array([volt_min, volt_max], dtype=float)
+            extensions = np.array([extension_min, extension_max], dtype=float)
+        else:
+            voltages, extensions = (np.asarray(column, dtype=float) for column in table)
+            if voltages.shape != extensions.shape or voltages.size < 2:
+                raise ValueError("A calibration table needs at least two (voltage, extension) points")
+
+        order = np.argsort(voltages)
+        self.voltages = voltages[order]
+        self.extensions = extensions[order]
+        self.linear = table is None or len(self.voltages) == 2
+
+        # Clamped affine maps from voltage to extension and pitch
+        self._lo, self._hi = float(self.voltages[0]), float(self.voltages[-1])
+        span = self._hi - self._lo
+        self._extension_slope = float(self.extensions[-1] - self.extensions[0]) / span
+        self._extension_offset = float(self.extensions[0]) - self._extension_slope * self._lo
+        self._pitch_slope = self._extension_slope / mount_height
+        self._pitch_offset = self._extension_offset / mount_height
+
+        # Pitch at each calibration point, in radians and in degrees
+        self._pitch_tables = {False: self.extensions / mount_height}
+        self._pitch_tables[True] = np.degrees(self._pitch_tables[False])
+
+    @classmethod
+    def from_calibration_file(cls, filename: str, mount_height: float = SENSOR_MOUNT_HEIGHT) -> "PitchSensorModel":
+        """Load a model from a CSV of voltage, extension rows."""
+        table = np.loadtxt(filename, delimiter=",", ndmin=2)
+        return cls(mount_height=mount_height, table=(table[:, 0], table[:, 1]))
+
+    def params(self) -> dict:
+        """Get the calibration as plain values, e.g. for cache keys."""
+        return {
+            "voltages": self.voltages.tolist(),
+            "extensions": self.extensions.tolist(),
+            "mount_height": self.mount_height,
+        }
+
+    def to_extension(self, voltage, out=None):
+        """Convert voltages to extensions (in).
+
+        Args:
+            voltage: A voltage or an array of them.
+            out: Optional float array to write the result to; it may be the input itself.
+
+        Returns:
+            A float for a scalar voltage, otherwise the array of extensions.
+        """
+        return self._convert(voltage, out, self._extension_slope, self._extension_offset, self.extensions)
+
+    def to_pitch(self, voltage, out=None, degrees: bool = True):
+        """Convert voltages to pitch angles.
+
+        Args:
+            voltage: A voltage or an array of them.
+            out: Optional float array to write the result to; it may be the input itself.
+            degrees: Give the pitch in degrees rather than radians.
+
+        Returns:
+            A float for a scalar voltage, otherwise the array of pitches.
+        """
+        scale = math.degrees(1.0) if degrees else 1.0
+        return self._convert(voltage, out, self._pitch_slope * scale, self._pitch_offset * scale, self._pitch_tables[degrees])
+
+    def _convert(self, voltage, out, slope, offset, table):
+        if out is None and (isinstance(voltage, (float, int)) or np.ndim(voltage) == 0):
+            # Scalars from the live loop skip numpy entirely
+            voltage = min(max(float(voltage), self._lo), self._hi)
+            if self.linear:
+                return voltage * slope + offset
+            return float(np.interp(voltage, self.voltages, table))
+
+        if out is None:
+            out = np.array(voltage, dtype=float)
+        elif out is not voltage:
+            np.copyto(out, voltage)
+
+        if not self.linear:
+            out[...] = np.interp(out, self.voltages, table)
+            return out
+
+        # Clamp, scale, and shift in place, without temporaries
+        np.clip(out, self._lo, self._hi, out=out)
+        out *= slope
+        out += offset
+        return out
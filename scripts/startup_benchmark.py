@@ -0,0 +1,83 @@
+"""Measure how long each experiment entry point takes to import.
+
+Every module is imported in a fresh interpreter under ``python -X importtime`` and the
+cumulative times it reports are summarised, along with the slowest imports it pulled in.
+
+Usage:
+    python startup_benchmark.py [module ...]
+"""
+
+import os
+import subprocess
+import sys
+
+ENTRY_POINTS = [
+    "pitch_compliance",
+    "pc",
+    "daq_reader",
+    "bravo_handler",
+    "config_loader",
+    "logger",
+    "process_data",
+]
+
+
+def import_times(module: str, repeats: int = 3) -> tuple[float, list[tuple[float, str]]] | None:
+    """Import a module in fresh interpreters and parse the -X importtime report.
+
+    Args:
+        module: The name of the module to import.
+        repeats: The number of runs; the fastest one is reported.
+
+    Returns:
+        The total import time (s) and the (cumulative time (s), module) pairs of the
+        fastest run, or None if the module failed to import.
+    """
+    best = None
+    for _ in range(repeats):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            return None
+
+        # Lines look like "import time:   self [us] |   cumulative | imported package"
+        entries = []
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            entries.append((int(cumulative) * 1e-6, name.rstrip()))
+
+        # The entry point itself is the last, outermost import
+        total = entries[-1][0]
+        if best is None or total < best[0]:
+            best = (total, entries)
+
+    return best
+
+
+def main(modules: list[str], top: int = 5) -> None:
+    for module in modules:
+        times = import_times(module)
+        if times is None:
+            print(f"{module:<20} failed to import (missing dependency?)")
+            continue
+
+        total, entries = times
+        print(f"{module:<20} {total * 1e3:8.1f} ms")
+
+        # The entry point's imports follow the last top-level import before it (such as
+        # site), and its direct imports are indented two more spaces than it is
+        depths = [len(name) - len(name.lstrip()) for _, name in entries]
+        first = max((i for i, depth in enumerate(depths[:-1]) if depth == 1), default=-1) + 1
+        direct = [(t, name.strip()) for (t, name), depth in zip(entries[first:], depths[first:]) if depth == 3]
+        for t, name in sorted(direct, reverse=True)[:top]:
+            print(f"    {name:<28} {t * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ENTRY_POINTS)
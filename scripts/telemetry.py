@@ -0,0 +1,426 @@
+"""Framed binary protocol for streaming live samples to viewers.
+
+Each frame is a fixed header followed by a batch of records:
+
+    magic "BRTM", version (u8), flags (u8), number of joints (u16), number of DAQ
+    channels (u16), number of records (u16), frame sequence number (u32), index of the
+    first sample (u64), payload length in bytes (u32)
+
+The records use the binary log layout (see logger.binary_log_dtype), so a frame's payload
+can be appended to a .bin log as-is. Sample indices increase by one per record, which
+lets a receiver count exactly how many samples it missed.
+
+TelemetryEncoder builds frames, TelemetryPublisher fans them out to any number of viewers,
+and TelemetryReader reads them back.
+"""
+
+import selectors
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+
+import numpy as np
+
+from logger import binary_log_dtype, init_logger
+
+TELEMETRY_MAGIC = b"BRTM"
+TELEMETRY_VERSION = 1
+TELEMETRY_HEADER = struct.Struct("<4sBBHHHIQI")
+TELEMETRY_PORT = 6969
+
+MAX_RECORDS_PER_FRAME = 0xFFFF
+
+
+class TelemetryHeader(NamedTuple):
+    num_joints: int
+    num_channels: int
+    num_records: int
+    sequence: int
+    first_sample: int
+    payload_length: int
+
+
+class TelemetryFrame(NamedTuple):
+    sequence: int
+    first_sample: int
+    records: np.ndarray
+
+
+def parse_header(header: bytes) -> TelemetryHeader:
+    """Unpack and validate a frame header."""
+    magic, version, _, *fields = TELEMETRY_HEADER.unpack(header)
+    if magic != TELEMETRY_MAGIC:
+        raise ValueError("Not a telemetry frame; the stream is out of sync")
+    if version != TELEMETRY_VERSION:
+        raise ValueError(f"Unsupported telemetry version {version}")
+
+    return TelemetryHeader(*fields)
+
+
+class TelemetryEncoder:
+    """Batches samples into telemetry frames.
+
+    Records are packed into a preallocated frame buffer, and a frame is handed out once it
+    holds batch_size records or its oldest record has waited max_delay seconds.
+    """
+
+    def __init__(
+        self,
+        num_joints: int = 7,
+        num_channels: int = 1,
+        batch_size: int = 32,
+        max_delay: float = 0.05,
+        clock=time.monotonic,
+    ) -> None:
+        """Create a new telemetry encoder.
+
+        Args:
+            num_joints: The length of the joint vector of each record.
+            num_channels: The number of DAQ channels of each record.
+            batch_size: The most records sent in one frame.
+            max_delay: The longest a record is held back waiting for a full batch (s).
+            clock: The time source used for max_delay.
+        """
+        if not 0 < batch_size <= MAX_RECORDS_PER_FRAME:
+            raise ValueError(f"batch_size must be between 1 and {MAX_RECORDS_PER_FRAME}")
+
+        self.num_joints = num_joints
+        self.num_channels = num_channels
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._clock = clock
+
+        self._record = struct.Struct(f"<d{num_joints}f{num_channels}f")
+        self._buffer = bytearray(TELEMETRY_HEADER.size + batch_size * self._record.size)
+
+        self.sequence = 0
+        self.next_sample = 0
+        self._num_records = 0
+        self._batch_start = 0.0
+
+    def add(self, timestamp: float, joint_positions, channels) -> bytes | None:
+        """Add a sample.
+
+        Args:
+            timestamp: The sample time (s).
+            joint_positions: The joint vector.
+            channels: The DAQ channel values, or a single value.
+
+        Returns:
+            A finished frame, or None while the batch is still filling.
+        """
+        if np.isscalar(channels):
+            channels = (channels,)
+
+        if self._num_records == 0:
+            self._batch_start = self._clock()
+
+        offset = TELEMETRY_HEADER.size + self._num_records * self._record.size
+        self._record.pack_into(self._buffer, offset, timestamp, *joint_positions, *channels)
+        self._num_records += 1
+
+        if self._num_records == self.batch_size or self._clock() - self._batch_start >= self.max_delay:
+            return self.flush()
+        return None
+
+    def flush(self) -> bytes | None:
+        """Get a frame of the records added so far, or None if there are none."""
+        if self._num_records == 0:
+            return None
+
+        payload_length = self._num_records * self._record.size
+        TELEMETRY_HEADER.pack_into(
+            self._buffer,
+            0,
+            TELEMETRY_MAGIC,
+            TELEMETRY_VERSION,
+            0,
+            self.num_joints,
+            self.num_channels,
+            self._num_records,
+            self.sequence,
+            self.next_sample,
+            payload_length,
+        )
+        frame = bytes(self._buffer[:TELEMETRY_HEADER.size + payload_length])
+
+        self.sequence = (self.sequence + 1) & 0xFFFFFFFF
+        self.next_sample += self._num_records
+        self._num_records = 0
+        return frame
+
+
+class TelemetryReader:
+    """Reads telemetry frames from a stream socket.
+
+    Short reads are completed before a frame is returned, and gaps in the sample indices
+    are counted in samples_missed.
+    """
+
+    def __init__(self, sock: socket.socket) -> None:
+        self._sock = sock
+        self._header = bytearray(TELEMETRY_HEADER.size)
+        self._payload = bytearray()
+        self._dtypes: dict[tuple[int, int], np.dtype] = {}
+
+        self.frames_received = 0
+        self.samples_received = 0
+        self.samples_missed = 0
+        self.gaps = 0
+        self._next_sample = None
+
+    def _recv_into(self, buffer) -> None:
+        view = memoryview(buffer)
+        while len(view):
+            received = self._sock.recv_into(view)
+            if received == 0:
+                raise ConnectionError("Telemetry stream closed")
+            view = view[received:]
+
+    def read_frame(self) -> TelemetryFrame:
+        """Block until a whole frame has arrived and decode it.
+
+        Raises:
+            ConnectionError: The sender closed the stream.
+            ValueError: The stream is not a telemetry stream or is corrupt.
+        """
+        self._recv_into(self._header)
+        header = parse_header(self._header)
+
+        layout = (header.num_joints, header.num_channels)
+        if layout not in self._dtypes:
+            self._dtypes[layout] = binary_log_dtype(*layout)
+        dtype = self._dtypes[layout]
+        if header.payload_length != header.num_records * dtype.itemsize:
+            raise ValueError("Telemetry payload length does not match its records")
+
+        if len(self._payload) < header.payload_length:
+            self._payload = bytearray(header.payload_length)
+        payload = memoryview(self._payload)[:header.payload_length]
+        self._recv_into(payload)
+
+        # The payload buffer is reused, so the records are copied out of it
+        records = np.frombuffer(payload, dtype=dtype).copy()
+
+        if self._next_sample is not None and header.first_sample > self._next_sample:
+            self.gaps += 1
+            self.samples_missed += header.first_sample - self._next_sample
+        self._next_sample = header.first_sample + header.num_records
+
+        self.frames_received += 1
+        self.samples_received += header.num_records
+        return TelemetryFrame(header.sequence, header.first_sample, records)
+
+    def stats(self) -> dict:
+        return {
+            "frames_received": self.frames_received,
+            "samples_received": self.samples_received,
+            "samples_missed": self.samples_missed,
+            "gaps": self.gaps,
+        }
+
+
+class _Subscriber:
+    def __init__(self, sock: socket.socket, address, max_queued_frames: int) -> None:
+        self.sock = sock
+        self.address = address
+        self.queue: deque[bytes] = deque(maxlen=max_queued_frames)
+        self.current: memoryview | None = None
+        self.frames_sent = 0
+        self.frames_dropped = 0
+
+    @property
+    def pending(self) -> bool:
+        return self.current is not None or bool(self.queue)
+
+
+class TelemetryPublisher:
+    """Serves telemetry frames to any number of viewers from a selector thread.
+
+    publish() never blocks: frames are handed to the publisher thread, which accepts new
+    viewers at any time and gives each one a bounded queue. A viewer that falls behind
+    loses its oldest queued frames rather than slowing down the publisher, and its reader
+    sees the loss as a gap in the sample indices.
+    """
+
+    def __init__(self, host: str | None = None, port: int = TELEMETRY_PORT, max_queued_frames: int = 256) -> None:
+        """Create a new telemetry publisher.
+
+        Args:
+            host: The address to listen on; defaults to this machine's hostname.
+            port: The port to listen on.
+            max_queued_frames: How many frames each viewer may fall behind by before its
+                oldest frames are dropped.
+        """
+        self.address = (host if host is not None else socket.gethostname(), port)
+        self.max_queued_frames = max_queued_frames
+
+        self._outbox: deque[bytes] = deque()
+        self._subscribers: dict[socket.socket, _Subscriber] = {}
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+
+        self.frames_published = 0
+        self.frames_dropped = 0
+        self.subscribers_served = 0
+
+        self._logger = init_logger("TelemetryPublisher")
+        self._running = False
+        self.publish_t = threading.Thread(target=self._run)
+        self.publish_t.daemon = True
+
+    def start(self) -> None:
+        """Start listening for viewers."""
+        self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(self.address)
+        self._listener.listen()
+        self._listener.setblocking(False)
+
+        self._selector.register(self._listener, selectors.EVENT_READ)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+
+        self._running = True
+        self.publish_t.start()
+
+    def stop(self) -> None:
+        """Disconnect every viewer and stop listening."""
+        if not self._running:
+            return
+
+        self._running = False
+        self._wake()
+        self.publish_t.join()
+
+        for subscriber in list(self._subscribers.values()):
+            self._disconnect(subscriber)
+        self._selector.close()
+        self._listener.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    @property
+    def num_subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, frame: bytes) -> None:
+        """Queue a frame for every connected viewer without blocking."""
+        if not self._running:
+            return
+
+        self._outbox.append(frame)
+        self.frames_published += 1
+        self._wake()
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": self.num_subscribers,
+            "subscribers_served": self.subscribers_served,
+            "frames_published": self.frames_published,
+            "frames_dropped": self.frames_dropped,
+        }
+
+    def _wake(self) -> None:
+        try:
+            self._wake_w.send(b"\0")
+        except BlockingIOError:
+            # A wakeup is already pending
+            pass
+
+    def _run(self) -> None:
+        while self._running:
+            for key, events in self._selector.select(timeout=0.5):
+                if key.fileobj is self._listener:
+                    self._accept()
+                elif key.fileobj is self._wake_r:
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                else:
+                    subscriber = self._subscribers.get(key.fileobj)
+                    if subscriber is None:
+                        continue
+                    if events & selectors.EVENT_READ:
+                        self._receive(subscriber)
+                    if events & selectors.EVENT_WRITE and subscriber.sock in self._subscribers:
+                        self._send(subscriber)
+
+            self._distribute()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                sock, address = self._listener.accept()
+            except BlockingIOError:
+                return
+
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._subscribers[sock] = _Subscriber(sock, address, self.max_queued_frames)
+            self._selector.register(sock, selectors.EVENT_READ)
+            self.subscribers_served += 1
+            self._logger.info(f"Telemetry viewer connected from {address}")
+
+    def _receive(self, subscriber: _Subscriber) -> None:
+        # Viewers never send anything, so readable means closed
+        try:
+            data = subscriber.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+
+        if not data:
+            self._disconnect(subscriber)
+
+    def _distribute(self) -> None:
+        while self._outbox:
+            frame = self._outbox.popleft()
+            for subscriber in list(self._subscribers.values()):
+                if len(subscriber.queue) == subscriber.queue.maxlen:
+                    # The queue drops its oldest frame to make room
+                    subscriber.frames_dropped += 1
+                    self.frames_dropped += 1
+                subscriber.queue.append(frame)
+
+        for subscriber in list(self._subscribers.values()):
+            if subscriber.pending:
+                self._send(subscriber)
+
+    def _send(self, subscriber: _Subscriber) -> None:
+        while subscriber.pending:
+            if subscriber.current is None:
+                subscriber.current = memoryview(subscriber.queue.popleft())
+
+            try:
+                sent = subscriber.sock.send(subscriber.current)
+            except BlockingIOError:
+                break
+            except OSError:
+                self._disconnect(subscriber)
+                return
+
+            subscriber.current = subscriber.current[sent:]
+            if not len(subscriber.current):
+                subscriber.current = None
+                subscriber.frames_sent += 1
+
+        # Only wait for the socket to drain while there is something left to send
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if subscriber.pending else 0)
+        self._selector.modify(subscriber.sock, events)
+
+    def _disconnect(self, subscriber: _Subscriber) -> None:
+        self._subscribers.pop(subscriber.sock, None)
+        self._selector.unregister(subscriber.sock)
+        subscriber.sock.close()
+        self._logger.info(
+            f"Telemetry viewer {subscriber.address} disconnected after {subscriber.frames_sent} frames "
+            f"({subscriber.frames_dropped} dropped)"
+        )
@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+import clock
+from rate_scheduler import RateScheduler
+
+
+def build_trajectory(configs, rate=50.0, max_joint_speed=0.2, dwell=5.0):
+    """Interpolate a joint-space path through a sequence of configurations.
+
+    Each configuration is held for the dwell time, and the moves between them are linear
+    in joint space and timed so that no joint exceeds max_joint_speed.
+
+    Args:
+        configs: The configurations to visit, shape (num_configs, num_joints).
+        rate: The control rate the setpoints are streamed at (Hz).
+        max_joint_speed: The speed limit of the fastest-moving joint (rad/s).
+        dwell: How long to hold each configuration (s).
+
+    Returns:
+        The setpoints, shape (num_steps, num_joints), and the index of the configuration
+        each step is moving to or holding, shape (num_steps,).
+    """
+    configs = np.asarray(configs, dtype=float)
+    hold_steps = max(int(round(dwell * rate)), 1)
+
+    setpoints = [np.repeat(configs[:1], hold_steps, axis=0)]
+    targets = [np.zeros(hold_steps, dtype=int)]
+
+    for i in range(1, len(configs)):
+        delta = configs[i] - configs[i - 1]
+        move_steps = max(int(np.ceil(np.abs(delta).max() / max_joint_speed * rate)), 1)
+        alpha = np.arange(1, move_steps + 1) / move_steps
+
+        setpoints.append(configs[i - 1] + alpha[:, None] * delta)
+        setpoints.append(np.repeat(configs[i:i + 1], hold_steps, axis=0))
+        targets.append(np.full(move_steps + hold_steps, i))
+
+    return np.concatenate(setpoints), np.concatenate(targets)
+
+
+def raise_thread_priority() -> bool:
+    """Try to give the calling thread real-time scheduling priority.
+
+    Returns:
+        Whether the priority was raised; this needs elevated permissions and is only
+        supported on Linux.
+    """
+    if not hasattr(os, "sched_setscheduler"):
+        return False
+
+    try:
+        priority = os.sched_get_priority_min(os.SCHED_FIFO)
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+    except OSError:
+        return False
+
+    return True
+
+
+class TrajectoryExecutor:
+    """Streams joint setpoints to the Bravo at a fixed rate from a dedicated thread."""
+
+    def __init__(self, bravo, setpoints, rate=50.0, all_joints=False) -> None:
+        """Create a new trajectory executor.
+
+        Args:
+            bravo: The BravoHandler used to command the arm and read its feedback.
+            setpoints: The joint setpoints to stream, shape (num_steps, num_joints).
+            rate: The control rate (Hz).
+            all_joints: Command each step with a single ALL_JOINTS packet.
+        """
+        self._bravo = bravo
+        self.setpoints = np.asarray(setpoints, dtype=float)
+        self.rate = rate
+        self.all_joints = all_joints
+
+        # Per-step timing and feedback, preallocated so the control loop never allocates
+        num_steps, num_joints = self.setpoints.shape
+        self.command_time = np.full(num_steps, np.nan)
+        self.send_duration = np.full(num_steps, np.nan)
+        self.lateness = np.full(num_steps, np.nan)
+        self.feedback_time = np.full(num_steps, np.nan)
+        self.feedback_sequence = np.zeros(num_steps, dtype=np.int64)
+        self.feedback_positions = np.full((num_steps, num_joints), np.nan)
+
+        self.steps_sent = 0
+        self.realtime_priority = False
+        self._scheduler = RateScheduler(rate)
+        self._running = False
+
+        self.control_t = threading.Thread(target=self._run)
+        self.control_t.daemon = True
+
+    def start(self) -> None:
+        """Start streaming the setpoints."""
+        self._running = True
+        self.control_t.start()
+
+    def stop(self) -> None:
+        """Stop streaming, leaving the arm at the last commanded setpoint."""
+        self._running = False
+        self.control_t.join()
+
+    def join(self, timeout: float | None = None) -> None:
+        """Wait for the trajectory to finish."""
+        self.control_t.join(timeout)
+
+    @property
+    def done(self) -> bool:
+        return self.steps_sent == len(self.setpoints)
+
+    def stats(self) -> dict:
+        """Get the timing statistics (s) of the steps sent so far."""
+        return {
+            "steps_sent": self.steps_sent,
+            "realtime_priority": self.realtime_priority,
+            "mean_send_duration": np.nanmean(self.send_duration[:self.steps_sent]) if self.steps_sent else float("nan"),
+            **self._scheduler.stats(),
+        }
+
+    def save(self, filename: str) -> None:
+        """Save the setpoints and the per-step timing and feedback of the steps sent to an .npz file."""
+        sent = self.steps_sent
+        np.savez(
+            filename,
+            rate=self.rate,
+            setpoints=self.setpoints[:sent],
+            command_time=self.command_time[:sent],
+            send_duration=self.send_duration[:sent],
+            lateness=self.lateness[:sent],
+            feedback_time=self.feedback_time[:sent],
+            feedback_sequence=self.feedback_sequence[:sent],
+            feedback_positions=self.feedback_positions[:sent],
+        )
+
+    def _run(self) -> None:
+        self.realtime_priority = raise_thread_priority()
+
+        lateness = 0.0
+        self._scheduler.reset()
+        for step, setpoint in enumerate(self.setpoints):
+            if not self._running:
+                break
+
+            # Stamped on the same clock as the joint snapshots
+            command_time = clock.now()
+            send_start = time.perf_counter()
+            self._bravo.send_joint_positions(setpoint, self.all_joints)
+            self.send_duration[step] = time.perf_counter() - send_start
+
+            snapshot = self._bravo.joint_snapshot()
+            self.command_time[step] = command_time
+            self.lateness[step] = lateness
+            self.feedback_time[step] = snapshot.timestamp
+            self.feedback_sequence[step] = snapshot.sequence
+            self.feedback_positions[step] = snapshot.positions
+            self.steps_sent = step + 1
+
+            lateness = self._scheduler.wait()